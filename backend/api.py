@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
 import jwt
@@ -858,7 +859,7 @@ def should_fetch_realtime_data(query: str) -> bool:
     # Fetch real-time if explicit request OR if asking about current conditions
     return has_realtime_keyword or has_data_keyword
 
-@app.get("/api/ocean/realtime/buoy/{station_id}")
+@app.get("/api/ocean/realtime/buoy/{station_id}", response_class=ORJSONResponse)
 async def get_realtime_buoy_data(station_id: str, user: dict = Depends(get_current_user)):
     """
     Get real-time data from NOAA buoy station
@@ -880,7 +881,7 @@ async def get_realtime_buoy_data(station_id: str, user: dict = Depends(get_curre
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/ocean/realtime/marine-weather")
+@app.get("/api/ocean/realtime/marine-weather", response_class=ORJSONResponse)
 async def get_realtime_marine_weather(
     lat: float,
     lon: float,
@@ -906,7 +907,7 @@ async def get_realtime_marine_weather(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/ocean/realtime/comprehensive")
+@app.get("/api/ocean/realtime/comprehensive", response_class=ORJSONResponse)
 async def get_comprehensive_ocean_report(
     lat: float,
     lon: float,
@@ -922,7 +923,7 @@ async def get_comprehensive_ocean_report(
         if not realtime_ocean_api:
             raise HTTPException(status_code=503, detail="Real-time API not available")
         
-        data = realtime_ocean_api.get_comprehensive_ocean_report(lat, lon, include_forecast)
+        data = await realtime_ocean_api.get_comprehensive_ocean_report_async(lat, lon, include_forecast)
         
         return data
         
@@ -930,7 +931,7 @@ async def get_comprehensive_ocean_report(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/ocean/realtime/sea-level")
+@app.get("/api/ocean/realtime/sea-level", response_class=ORJSONResponse)
 async def get_sea_level_data(
     lat: float,
     lon: float,
@@ -953,7 +954,7 @@ async def get_sea_level_data(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/ocean/realtime/argo-floats")
+@app.get("/api/ocean/realtime/argo-floats", response_class=ORJSONResponse)
 async def get_argo_floats_nearby(
     lat: float,
     lon: float,
@@ -1016,7 +1017,7 @@ async def send_chat_message(message: ChatMessage, user: dict = Depends(get_curre
                         logger.info("No nearby buoy, using marine weather")
                         
                 elif any(word in query_lower for word in ["comprehensive", "all", "complete", "full"]):
-                    realtime_data = realtime_ocean_api.get_comprehensive_ocean_report(lat, lon)
+                    realtime_data = await realtime_ocean_api.get_comprehensive_ocean_report_async(lat, lon)
                     logger.info("Using comprehensive report")
                     
                 else:
@@ -1687,8 +1688,8 @@ async def get_user_activity(user: dict = Depends(get_current_user)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# Health check
-@app.get("/api/health")
+# Health check; HEAD lets liveness probes skip the response body
+@app.api_route("/api/health", methods=["GET", "HEAD"])
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
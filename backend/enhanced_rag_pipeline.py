@@ -85,12 +85,16 @@ class EnhancedRAGPipeline:
                 logger.warning("No NetCDF files were found or processed.")
                 return {"status": "no_files", "message": "No NetCDF files found in the specified directory."}
             
-            # Add extracted profile data to the vector store
+            # Add extracted profile data to the vector store in one batch so the
+            # encoder can group similar-length contents across files
+            profile_frames = [
+                file_data['profile_data'] for file_data in processed_files
+                if 'profile_data' in file_data and not file_data['profile_data'].empty
+            ]
             total_profiles = 0
-            for file_data in processed_files:
-                if 'profile_data' in file_data and not file_data['profile_data'].empty:
-                    doc_ids = self.vector_store.add_profile_data(file_data['profile_data'])
-                    total_profiles += len(doc_ids)
+            if profile_frames:
+                doc_ids = self.vector_store.add_profile_data(pd.concat(profile_frames))
+                total_profiles = len(doc_ids)
             
             # Create a summary report of the processing task
             summary = self.netcdf_processor.create_summary_report(processed_files)
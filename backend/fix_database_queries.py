@@ -1,18 +1,35 @@
-import os
 import sys
 
+API_FILE = "api.py"
+
+FIX_SUMMARY = """
+ All database query issues fixed!
+
+ Fixed issues:
+ Removed text() wrapper from queries
+ Added safe query function with error handling
+ Fixed ocean parameters query
+ Fixed dashboard stats query
+
+ The backend should now work without query errors!
+"""
+
+def replace_block(content, old, new):
+    """Replace every occurrence of old in one scan, returning the new content and whether it was found"""
+    parts = content.split(old)
+    return new.join(parts), len(parts) > 1
+
 def fix_api_queries():
     """Fix all database query issues in api.py"""
-    api_file = "api.py"
-    if not os.path.exists(api_file):
-        print(" api.py not found")
-        return False
-    
     print(" Fixing database query issues...")
     
     # Read the current file
-    with open(api_file, 'r') as f:
-        content = f.read()
+    try:
+        with open(API_FILE, 'r') as f:
+            original = content = f.read()
+    except FileNotFoundError:
+        print(" api.py not found, please run this from the backend directory")
+        return False
     
     # Fix 1: Remove text() wrapper from queries
     old_query = '''columns_query = text("""
@@ -27,8 +44,8 @@ def fix_api_queries():
             WHERE table_name = 'oceanbench_data'
             ORDER BY ordinal_position
         """''' 
-    if old_query in content:
-        content = content.replace(old_query, new_query)
+    content, found = replace_block(content, old_query, new_query)
+    if found:
         print(" Fixed columns query")
     
     # Fix 2: Add better error handling for database queries
@@ -75,8 +92,8 @@ def safe_run_query(engine, query, params=None):
             # Fallback for SQLite
             parameters = ['''
     
-    if old_ocean_params in content:
-        content = content.replace(old_ocean_params, new_ocean_params)
+    content, found = replace_block(content, old_ocean_params, new_ocean_params)
+    if found:
         print(" Fixed ocean parameters query")
     
     # Fix 4: Update dashboard stats to use safe queries
@@ -86,13 +103,16 @@ def safe_run_query(engine, query, params=None):
     new_dashboard = '''        total_records_df = safe_run_query(engine, 'SELECT COUNT(*) as count FROM oceanbench_data')
         total_records = total_records_df.iloc[0]['count'] if total_records_df is not None and not total_records_df.empty else 0'''
     
-    if old_dashboard in content:
-        content = content.replace(old_dashboard, new_dashboard)
+    content, found = replace_block(content, old_dashboard, new_dashboard)
+    if found:
         print(" Fixed dashboard stats query")
     
-    # Write the fixed content back
-    with open(api_file, 'w') as f:
-        content = f.write(content)
+    # Write the fixed content back, unless every fix was already applied
+    if content == original:
+        print(" api.py already has all query fixes")
+        return True
+    with open(API_FILE, 'w') as f:
+        f.write(content)
     
     print(" Database query fixes applied successfully!")
     return True
@@ -102,18 +122,8 @@ def main():
     print("🌊 NeptuneAI Database Query Fix")
     print("=" * 35)
     
-    if not os.path.exists("api.py"):
-        print(" Please run this from the backend directory")
-        return
-    
     if fix_api_queries():
-        print("\n All database query issues fixed!")
-        print("\n Fixed issues:")
-        print(" Removed text() wrapper from queries")
-        print(" Added safe query function with error handling")
-        print(" Fixed ocean parameters query")
-        print(" Fixed dashboard stats query")
-        print("\n The backend should now work without query errors!")
+        sys.stdout.write(FIX_SUMMARY)
     else:
         print("\n Database query fix failed!")
 
@@ -1,4 +1,5 @@
 import os
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 files_to_fix = {
     'rag_pipeline.py': [
         ('from backend.query_engine import', 'from backend.query_engine import')
@@ -8,13 +9,20 @@ files_to_fix = {
     ]
 }
 for filename, replacements in files_to_fix.items():
-    filepath = os.path.join(os.path.dirname(__file__), filename)
-    if os.path.exists(filepath):
+    filepath = os.path.join(BACKEND_DIR, filename)
+    try:
         with open(filepath, 'r') as f:
-            content = f.read()      
-        for old, new in replacements:
-            content = content.replace(old, new) 
-        with open(filepath, 'w') as f:
-            f.write(content)
-        print(f"Fixed {filename}")
+            original = f.read()
+    except FileNotFoundError:
+        continue
+    content = original
+    for old, new in replacements:
+        content = content.replace(old, new) 
+    # Leave already-fixed files (and their mtimes) untouched
+    if content == original:
+        print(f"{filename} already fixed")
+        continue
+    with open(filepath, 'w') as f:
+        f.write(content)
+    print(f"Fixed {filename}")
 print("Done!")
\ No newline at end of file
@@ -1,10 +1,19 @@
 import os
+import re
+import time
 import json
 import logging
-import requests
+import threading
+import httpx
 from groq import Groq
 from dotenv import load_dotenv
 import pandas as pd
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from dataclasses import dataclass, field, asdict, is_dataclass
+from typing import Mapping, Optional, Tuple
+from itertools import islice
 from datetime import datetime, timedelta
 
 logging.basicConfig(level=logging.INFO)
@@ -16,6 +25,14 @@ from query_engine import (
     query_by_region,
     get_geographic_coverage,
 )
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj, indent=2, default=lambda o: asdict(o) if is_dataclass(o) else str(o))
 # Import enhanced components
 try:
     from enhanced_rag_pipeline import EnhancedRAGPipeline
@@ -26,20 +43,30 @@ except ImportError as e:
     ENHANCED_AVAILABLE = False
 load_dotenv()
 # Initialize Groq client
+# One process-wide HTTP client so TLS/TCP connections are kept alive across queries
+http_client = httpx.Client(
+    limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+    timeout=30.0,
+)
 try:
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         raise ValueError("GROQ_API_KEY not found in environment variables.")
-    client = Groq(api_key=api_key)
+    client = Groq(api_key=api_key, http_client=http_client)
     GROQ_AVAILABLE = True
     logger.info(" Groq AI initialized")
 except Exception as e:
     logger.warning(f" Groq not available: {e}")
     client = None
     GROQ_AVAILABLE = False
-# Conversation history
-conversation_history = []
+@lru_cache(maxsize=1)
+def _engine():
+    """Database engine resolved once per process and reused by every query."""
+    return get_db_engine()
+
+# Conversation history (bounded ring buffer - oldest turns evicted on append)
 MAX_HISTORY = 15
+conversation_history = deque(maxlen=MAX_HISTORY)
 user_profile = {"name": None, "preferences": [], "previous_queries": []}
 
 # Ocean data knowledge base (comprehensive facts)
@@ -137,9 +164,74 @@ OCEAN_KNOWLEDGE = {
     }
 }
 
-def analyze_sentiment_advanced(user_input: str, user_name: str = None):
-    """Advanced sentiment and behavioral analysis."""
-    user_lower = user_input.lower()
+# Sentiment keyword tables (module-level so they are built once, not per query)
+_NAME_RE = re.compile(r"\b(?:i am|i'm|my name is|call me|this is)\s+([A-Za-z]{3,})\b", re.IGNORECASE)
+GREETING_WORDS = ("hello", "hi", "hey", "good morning", "good afternoon", "good evening", "greetings")
+THANKS_WORDS = ("thank", "thanks", "appreciate", "grateful")
+FRUSTRATION_WORDS = ("why not", "doesn't work", "can't", "wrong", "error", "stupid", "useless", "bad")
+CURIOSITY_WORDS = ("how", "what", "when", "where", "why", "tell me", "explain", "curious", "interesting", "want to know")
+URGENCY_WORDS = ("urgent", "quickly", "asap", "immediately", "now", "emergency", "critical")
+TECHNICAL_TERMS = ("salinity", "psu", "thermocline", "upwelling", "stratification", "bathymetry")
+FOLLOWUP_WORDS = ("yes", "yeah", "sure", "okay", "tell me more", "continue", "go on", "and", "also")
+# Whole words only, so "andaman" or "sandy" is not read as "and"
+_FOLLOWUP_RE = re.compile(r"\b(?:" + "|".join(re.escape(word) for word in FOLLOWUP_WORDS) + r")\b")
+FORMAL_WORDS = ("could you", "would you", "please", "kindly", "sir", "madam")
+
+def _count_keywords(text: str, keywords: tuple) -> int:
+    """Count how many keywords occur in the (lowercased) text."""
+    count = 0
+    for word in keywords:
+        if word in text:
+            count += 1
+    return count
+
+@dataclass(frozen=True)
+class OceanFacts:
+    """Immutable knowledge-base entry for one region, with derived fields precomputed."""
+    average_depth: str
+    max_depth: str
+    average_temperature: str
+    average_salinity: str
+    sea_level_trend: str
+    area: str
+    volume: Optional[str] = None
+    disasters: Mapping[str, str] = field(default_factory=dict)
+    key_features: Tuple[str, ...] = ()
+    marine_life: Optional[str] = None
+    current_threats: Optional[str] = None
+    surface_temp_estimate: str = "N/A"
+
+def _build_ocean_facts(entry: dict) -> OceanFacts:
+    fields = dict(entry)
+    fields["disasters"] = dict(entry.get("disasters", {}))
+    fields["key_features"] = tuple(entry.get("key_features", ()))
+    fields["surface_temp_estimate"] = entry["average_temperature"].split()[0]
+    return OceanFacts(**fields)
+
+OCEAN_FACTS = {region: _build_ocean_facts(entry) for region, entry in OCEAN_KNOWLEDGE.items()}
+
+# Per-region queue of templated facts served to short follow-ups ("yes", "go on")
+_followup_facts = {}
+
+def _build_followup_facts(region: str) -> deque:
+    """Queue the knowledge-base facts for a region in the order they are served."""
+    facts = OCEAN_FACTS[region]
+    queue = deque(f"{feature}." for feature in facts.key_features)
+    for kind, description in facts.disasters.items():
+        queue.append(f"{kind.replace('_', ' ').title()}: {description}.")
+    if facts.marine_life:
+        queue.append(f"Marine life: {facts.marine_life}.")
+    if facts.current_threats:
+        queue.append(f"Current threats: {facts.current_threats}.")
+    return queue
+
+def analyze_sentiment_advanced(user_input: str, user_name: str = None, user_lower: str = None):
+    """Advanced sentiment and behavioral analysis.
+
+    ``user_lower`` may be passed when the caller has already lowercased the input.
+    """
+    if user_lower is None:
+        user_lower = user_input.lower()
     
     sentiment = {
         "emotion": "neutral",
@@ -155,66 +247,79 @@ def analyze_sentiment_advanced(user_input: str, user_name: str = None):
     }
     
     # Detect name introduction
-    name_patterns = ["i am", "i'm", "my name is", "call me", "this is"]
-    if any(pattern in user_lower for pattern in name_patterns):
-        words = user_input.split()
-        for i, word in enumerate(words):
-            if word.lower() in name_patterns and i + 1 < len(words):
-                potential_name = words[i + 1].strip('.,!?')
-                if potential_name.isalpha() and len(potential_name) > 2:
-                    user_profile["name"] = potential_name.title()
+    name_match = _NAME_RE.search(user_input)
+    if name_match:
+        user_profile["name"] = name_match.group(1).title()
     
     # Greetings
-    greetings = ["hello", "hi", "hey", "good morning", "good afternoon", "good evening", "greetings"]
-    if any(g in user_lower for g in greetings):
+    if any(g in user_lower for g in GREETING_WORDS):
         sentiment["is_greeting"] = True
         sentiment["emotion"] = "friendly"
     
     # Thanks
-    thanks = ["thank", "thanks", "appreciate", "grateful"]
-    if any(t in user_lower for t in thanks):
+    if any(t in user_lower for t in THANKS_WORDS):
         sentiment["is_thanking"] = True
         sentiment["emotion"] = "grateful"
     
     # Frustration indicators
-    frustration_words = ["why not", "doesn't work", "can't", "wrong", "error", "stupid", "useless", "bad"]
-    frustration_count = sum(1 for word in frustration_words if word in user_lower)
+    frustration_count = _count_keywords(user_lower, FRUSTRATION_WORDS)
     sentiment["frustration_level"] = min(frustration_count * 2, 10)
     if sentiment["frustration_level"] > 3:
         sentiment["emotion"] = "frustrated"
         sentiment["needs_empathy"] = True
     
     # Curiosity
-    curiosity_words = ["how", "what", "when", "where", "why", "tell me", "explain", "curious", "interesting", "want to know"]
-    curiosity_count = sum(1 for word in curiosity_words if word in user_lower)
+    curiosity_count = _count_keywords(user_lower, CURIOSITY_WORDS)
     sentiment["curiosity_level"] = min(curiosity_count * 2, 10)
     if sentiment["curiosity_level"] > 3:
         sentiment["emotion"] = "curious"
     
     # Urgency
-    urgency_words = ["urgent", "quickly", "asap", "immediately", "now", "emergency", "critical"]
-    if any(word in user_lower for word in urgency_words):
+    if any(word in user_lower for word in URGENCY_WORDS):
         sentiment["urgency"] = "high"
     
     # Technical level detection
-    technical_terms = ["salinity", "psu", "thermocline", "upwelling", "stratification", "bathymetry"]
-    if any(term in user_lower for term in technical_terms):
+    if any(term in user_lower for term in TECHNICAL_TERMS):
         sentiment["technical_level"] = "advanced"
     elif len(user_input.split()) > 15:
         sentiment["technical_level"] = "intermediate"
     
     # Follow-up detection
-    followup_words = ["yes", "yeah", "sure", "okay", "tell me more", "continue", "go on", "and", "also"]
-    if len(user_input.split()) <= 5 and any(word in user_lower for word in followup_words):
+    if len(user_input.split()) <= 5 and _FOLLOWUP_RE.search(user_lower):
         sentiment["is_followup"] = True
     
     # Formality
-    formal_words = ["could you", "would you", "please", "kindly", "sir", "madam"]
-    if any(word in user_lower for word in formal_words):
+    if any(word in user_lower for word in FORMAL_WORDS):
         sentiment["formality"] = "formal"
     
     return sentiment
 
+# Lowercase region name -> canonical name, and one alternation matching any of them
+OCEAN_KNOWLEDGE_LOWER = {name.lower(): name for name in OCEAN_KNOWLEDGE}
+_REGION_RE = re.compile("|".join(re.escape(name) for name in OCEAN_KNOWLEDGE_LOWER))
+
+def detect_region(text_lower: str):
+    """Return the first known ocean region named in the lowercased text, if any."""
+    match = _REGION_RE.search(text_lower)
+    return OCEAN_KNOWLEDGE_LOWER[match.group(0)] if match else None
+
+# Today's date string and month, refreshed at most once a minute
+_DATE_CACHE = {"t": 0.0, "s": "", "month": 0}
+
+def _current_date():
+    """Return (YYYY-MM-DD, month) from a minute-resolution cache."""
+    now = time.time()
+    if now - _DATE_CACHE["t"] > 60:
+        today = datetime.now()
+        _DATE_CACHE.update(t=now, s=today.strftime("%Y-%m-%d"), month=today.month)
+    return _DATE_CACHE["s"], _DATE_CACHE["month"]
+
+# Cyclone season per region: (months, in-season risk, off-season risk)
+CYCLONE_SEASONS = {
+    "Bay of Bengal": (frozenset({4, 5, 10, 11}), "HIGH - Cyclone season active", "Moderate"),
+    "Indian Ocean": (frozenset({11, 12, 1, 2, 3, 4}), "Elevated - Southern summer cyclone season", "Low to moderate"),
+}
+
 def get_ocean_data(region: str, query_type: str):
     """
     Fetch comprehensive ocean data for a region.
@@ -222,78 +327,71 @@ def get_ocean_data(region: str, query_type: str):
     """
     if region not in OCEAN_KNOWLEDGE:
         # Try to find closest match
-        for known_region in OCEAN_KNOWLEDGE.keys():
-            if known_region.lower() in region.lower() or region.lower() in known_region.lower():
-                region = known_region
-                break
-        else:
-            return None    
-    data = OCEAN_KNOWLEDGE[region].copy()   
+        region_lower = region.lower()
+        known_region = detect_region(region_lower)
+        if known_region is None:
+            known_region = next(
+                (name for lower, name in OCEAN_KNOWLEDGE_LOWER.items() if region_lower in lower),
+                None,
+            )
+        if known_region is None:
+            return None
+        region = known_region
+    facts = OCEAN_FACTS[region]
     # Add current conditions (simulated - in production, use real APIs)
-    current_date = datetime.now()
-    data["current_conditions"] = {
-        "date": current_date.strftime("%Y-%m-%d"),
-        "surface_temp_estimate": data["average_temperature"].split()[0] if "average_temperature" in data else "N/A",
-        "weather_status": "Normal monitoring conditions",
-        "recent_alerts": "No active warnings (last 7 days)"
-    }    
+    current_date, current_month = _current_date()
+    data = {
+        "region": region,
+        "facts": facts,
+        "current_conditions": {
+            "date": current_date,
+            "surface_temp_estimate": facts.surface_temp_estimate,
+            "weather_status": "Normal monitoring conditions",
+            "recent_alerts": "No active warnings (last 7 days)"
+        }
+    }
     # Add disaster risk assessment
-    if "disasters" in data:
-        current_month = current_date.month
-        if region == "Bay of Bengal":
-            if current_month in [4, 5, 10, 11]:
-                data["current_conditions"]["cyclone_risk"] = "HIGH - Cyclone season active"
-            else:
-                data["current_conditions"]["cyclone_risk"] = "Moderate"
-        elif region == "Indian Ocean":
-            if current_month in [11, 12, 1, 2, 3, 4]:
-                data["current_conditions"]["cyclone_risk"] = "Elevated - Southern summer cyclone season"
-            else:
-                data["current_conditions"]["cyclone_risk"] = "Low to moderate"   
+    season = CYCLONE_SEASONS.get(region)
+    if season and facts.disasters:
+        months, in_season_risk, off_season_risk = season
+        data["current_conditions"]["cyclone_risk"] = in_season_risk if current_month in months else off_season_risk
     return data
+# Background worker for DB fetches overlapped with sentiment analysis
+_db_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rag-db")
+
+# Deployment data cache: region -> (expires_at, data)
+DEPLOYMENT_CACHE_TTL = 600  # 10 minutes
+_deployment_cache = {}
+
+def clear_deployment_cache():
+    """Drop cached deployment data so the next query hits the database."""
+    _deployment_cache.clear()
+
 def get_deployment_data(engine, region: str):
-    """Get profiler deployment data from database."""
+    """Get profiler deployment data from database (cached per region with a TTL)."""
+    cached = _deployment_cache.get(region)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
     try:
         df = query_by_region(engine, region, limit=50)
         coverage = get_geographic_coverage(engine, region=region)       
         if df is not None and not df.empty:
-            return {
+            data = {
                 "has_data": True,
                 "deployment_count": len(df),
                 "institutions": df['institution'].unique().tolist() if 'institution' in df.columns else [],
                 "profiler_types": df['profiler'].unique().tolist() if 'profiler' in df.columns else [],
                 "coverage": coverage.to_dict('records')[0] if not coverage.empty else {}
             }
-        return {"has_data": False}
+        else:
+            data = {"has_data": False}
+        _deployment_cache[region] = (time.monotonic() + DEPLOYMENT_CACHE_TTL, data)
+        return data
     except Exception as e:
         print(f" Database query failed: {e}")
         return {"has_data": False}
-def generate_intelligent_response(user_input: str, ocean_data: dict, deployment_data: dict, 
-                                  sentiment: dict, context: list):
-    """Generate natural, empathetic, and informative responses using Groq."""   
-    if not GROQ_AVAILABLE:
-        return generate_fallback_response(ocean_data, deployment_data)    
-    try:
-        # Build context from conversation history
-        history_context = ""
-        if context:
-            history_context = "Recent conversation:\n"
-            for msg in context[-3:]:
-                history_context += f"User: {msg['user'][:100]}\n"
-                history_context += f"Assistant: {msg['assistant'][:100]}...\n"       
-        # Build comprehensive data context
-        data_context = f"""
-OCEAN DATA AVAILABLE:
-{json.dumps(ocean_data, indent=2)}
-PROFILER DEPLOYMENT DATA:
-{json.dumps(deployment_data, indent=2)}
-USER PROFILE:
-Name: {user_profile.get('name', 'Not provided')}
-Technical Level: {sentiment['technical_level']}
-Emotional State: {sentiment['emotion']}
-{history_context}
-"""        
-        system_prompt = f"""You are NeptuneAI, an advanced oceanographic AI assistant with comprehensive knowledge of ocean data.
+# Static system prompt, assembled once; only the user name and sentiment tail vary per query
+_SYSTEM_PROMPT_HEAD = """You are NeptuneAI, an advanced oceanographic AI assistant with comprehensive knowledge of ocean data.
 PERSONALITY:
 - Warm, friendly, and empathetic
 - Enthusiastic about ocean science
@@ -311,7 +409,8 @@ You have access to REAL oceanographic data including:
 - Current ocean conditions
 - Retrieval-augmented responses from real float data
 RESPONSE GUIDELINES:
-1. Address user by name if known ({user_profile.get('name', '')})
+1. Address user by name if known ("""
+_SYSTEM_PROMPT_BODY = """)
 2. Match user's emotional tone:
    - If curious: Be enthusiastic and educational
    - If frustrated: Be empathetic and solution-focused
@@ -331,10 +430,75 @@ RESPONSE GUIDELINES:
    - Always mention disaster risks honestly but without causing panic
    - Provide actionable information when discussing dangers
    - Emphasize the importance of ocean conservation
-Current user sentiment: {sentiment['emotion']}
-Urgency level: {sentiment['urgency']}
-Technical level: {sentiment['technical_level']}
 """
+_SYSTEM_PROMPT_TAIL = """Current user sentiment: {emotion}
+Urgency level: {urgency}
+Technical level: {technical_level}
+"""
+
+# LRU cache of completed Groq responses keyed on the normalized query; the
+# lock makes lookup + move_to_end and insert + evict atomic across API threads
+RESPONSE_CACHE_SIZE = 512
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def _response_cache_key(user_input: str, ocean_data: dict, sentiment: dict):
+    """Bag-of-words key so rephrasings with the same words share a response."""
+    norm_query = " ".join(sorted(_TOKEN_RE.findall(user_input.lower())))
+    region = ocean_data.get("region") if ocean_data else None
+    return (norm_query, region, sentiment['emotion'], sentiment['technical_level'], user_profile.get('name'))
+
+def stream_intelligent_response(user_input: str, ocean_data: dict, deployment_data: dict,
+                                sentiment: dict, context):
+    """Stream a natural, empathetic response from Groq chunk by chunk.
+
+    Completed responses are cached and replayed for repeated queries, except
+    for urgent queries which always go to the model.
+    """
+    if not GROQ_AVAILABLE:
+        yield generate_fallback_response(ocean_data, deployment_data)
+        return
+    cache_key = None
+    if sentiment['urgency'] != "high":
+        cache_key = _response_cache_key(user_input, ocean_data, sentiment)
+        with _response_cache_lock:
+            cached = _response_cache.get(cache_key)
+            if cached is not None:
+                _response_cache.move_to_end(cache_key)
+        if cached is not None:
+            yield cached
+            return
+    try:
+        # Build context from conversation history
+        history_context = ""
+        if context:
+            history_context = "Recent conversation:\n"
+            for msg in islice(context, max(0, len(context) - 3), len(context)):
+                history_context += f"User: {msg['user'][:100]}\n"
+                history_context += f"Assistant: {msg['assistant'][:100]}...\n"       
+        # Build comprehensive data context
+        data_context = f"""
+OCEAN DATA AVAILABLE:
+{_dumps(ocean_data)}
+PROFILER DEPLOYMENT DATA:
+{_dumps(deployment_data)}
+USER PROFILE:
+Name: {user_profile.get('name', 'Not provided')}
+Technical Level: {sentiment['technical_level']}
+Emotional State: {sentiment['emotion']}
+{history_context}
+"""        
+        system_prompt = (
+            _SYSTEM_PROMPT_HEAD
+            + (user_profile.get('name') or '')
+            + _SYSTEM_PROMPT_BODY
+            + _SYSTEM_PROMPT_TAIL.format(
+                emotion=sentiment['emotion'],
+                urgency=sentiment['urgency'],
+                technical_level=sentiment['technical_level'],
+            )
+        )
         user_prompt = f"""User query: "{user_input}"
 Available data:
 {data_context}
@@ -346,42 +510,76 @@ Generate a natural, helpful response that directly answers their question using
                 {"role": "user", "content": user_prompt},
             ],
             temperature=0.7,
-            max_tokens=800
-        )    
-        return response.choices[0].message.content      
+            max_tokens=800,
+            stream=True
+        )
+        parts = []
+        for chunk in response:
+            text = chunk.choices[0].delta.content or ""
+            parts.append(text)
+            yield text
+        if cache_key is not None:
+            with _response_cache_lock:
+                _response_cache[cache_key] = "".join(parts)
+                if len(_response_cache) > RESPONSE_CACHE_SIZE:
+                    _response_cache.popitem(last=False)
     except Exception as e:
         print(f" Response generation failed: {e}")
-        return generate_fallback_response(ocean_data, deployment_data)
+        yield generate_fallback_response(ocean_data, deployment_data)
+def generate_intelligent_response(user_input: str, ocean_data: dict, deployment_data: dict, 
+                                  sentiment: dict, context):
+    """Generate natural, empathetic, and informative responses using Groq."""
+    return "".join(stream_intelligent_response(
+        user_input, ocean_data, deployment_data, sentiment, context
+    ))
 def generate_fallback_response(ocean_data: dict, deployment_data: dict):
     """Fallback response when LLM is unavailable."""
     response = "Based on available data:\n\n"    
     if ocean_data:
+        facts = ocean_data["facts"]
         response += f" Ocean Characteristics:\n"
-        if "average_depth" in ocean_data:
-            response += f"• Average Depth: {ocean_data['average_depth']}\n"
-        if "average_temperature" in ocean_data:
-            response += f"• Temperature: {ocean_data['average_temperature']}\n"
-        if "average_salinity" in ocean_data:
-            response += f"• Salinity: {ocean_data['average_salinity']}\n"
-        if "sea_level_trend" in ocean_data:
-            response += f"• Sea Level Trend: {ocean_data['sea_level_trend']}\n"    
+        response += f"• Average Depth: {facts.average_depth}\n"
+        response += f"• Temperature: {facts.average_temperature}\n"
+        response += f"• Salinity: {facts.average_salinity}\n"
+        response += f"• Sea Level Trend: {facts.sea_level_trend}\n"    
     if deployment_data and deployment_data.get("has_data"):
         response += f"\n🔬 Monitoring Data:\n"
         response += f"• Active Deployments: {deployment_data['deployment_count']}\n"
         response += f"• Research Institutions: {len(deployment_data['institutions'])}\n" 
     return response
-def answer_query(user_input: str):
-    """Main query processing with comprehensive ocean data."""
+# Construct the enhanced pipeline in the background from import, so the first
+# query doesn't pay for it; a failed construction is retried on the next query
+_pipeline_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-init")
+_enhanced_pipeline_future: Optional[Future] = None
+_enhanced_pipeline_lock = threading.Lock()
+
+def _start_enhanced_pipeline() -> Future:
+    """Return the enhanced pipeline's future, submitting its construction if none is running or it failed."""
+    global _enhanced_pipeline_future
+    with _enhanced_pipeline_lock:
+        future = _enhanced_pipeline_future
+        if future is None or (future.done() and future.exception() is not None):
+            future = _enhanced_pipeline_future = _pipeline_executor.submit(EnhancedRAGPipeline)
+        return future
+
+if ENHANCED_AVAILABLE:
+    _start_enhanced_pipeline()
+
+def answer_query(user_input: str, stream: bool = False):
+    """Main query processing with comprehensive ocean data.
+
+    With ``stream=True`` the LLM-generated ``summary`` is returned as a generator
+    of text chunks; the turn is recorded in history once the stream is consumed.
+    """
     logger.info(f"Processing user query: {user_input}")
     # Use enhanced pipeline if available
     if ENHANCED_AVAILABLE:
         try:
-            # Initialize enhanced pipeline (singleton pattern)
-            if not hasattr(answer_query, 'enhanced_pipeline'):
-                answer_query.enhanced_pipeline = EnhancedRAGPipeline()
+            # Only blocks while the background construction is still running
+            enhanced_pipeline = _start_enhanced_pipeline().result()
             logger.info(" Enhanced RAG pipeline initialized")
             # Process query with enhanced pipeline
-            result = answer_query.enhanced_pipeline.process_query(user_input)
+            result = enhanced_pipeline.process_query(user_input)
             logger.info(" Enhanced RAG pipeline processed query")
             # Convert to expected format
             return {
@@ -393,9 +591,16 @@ def answer_query(user_input: str):
         except Exception as e:
             print(f"Enhanced pipeline error: {e}, falling back to basic pipeline")
     try:
+        engine = _engine()
+        # Start the DB fetch for an explicitly named region while sentiment runs
+        user_lower = user_input.lower()
+        prefetch_region = detect_region(user_lower)
+        deployment_future = (
+            _db_executor.submit(get_deployment_data, engine, prefetch_region)
+            if prefetch_region else None
+        )
         # Analyze sentiment
-        engine = get_db_engine()
-        sentiment = analyze_sentiment_advanced(user_input, user_profile.get("name"))        
+        sentiment = analyze_sentiment_advanced(user_input, user_profile.get("name"), user_lower)        
         # Handle greetings
         if sentiment["is_greeting"]:
             greeting = f"Hello{', ' + user_profile['name'] if user_profile['name'] else ''}! 👋 "
@@ -409,7 +614,8 @@ def answer_query(user_input: str):
             conversation_history.append({
                 "user": user_input,
                 "assistant": greeting,
-                "sentiment": sentiment['emotion']
+                "sentiment": sentiment['emotion'],
+                "region": None
             })
             return {"summary": greeting, "plot": None}        
         # Handle thanks
@@ -419,32 +625,63 @@ def answer_query(user_input: str):
             conversation_history.append({
                 "user": user_input,
                 "assistant": thanks_response,
-                "sentiment": sentiment['emotion']
+                "sentiment": sentiment['emotion'],
+                "region": None
             })
             return {"summary": thanks_response, "plot": None}      
         # Handle follow-ups
         if sentiment["is_followup"] and conversation_history:
             # Get region from last conversation
-            last_msg = conversation_history[-1]["assistant"]
-            region = None
-            for known_region in OCEAN_KNOWLEDGE.keys():
-                if known_region in last_msg:
-                    region = known_region
-                    break           
+            region = conversation_history[-1].get("region")
             if region:
-                user_input = f"{user_input} about {region}"       
+                # Serve the next templated fact without an LLM call unless the
+                # user is curious or names another region ("and the Pacific?")
+                if sentiment["curiosity_level"] <= 3 and prefetch_region in (None, region):
+                    facts_queue = _followup_facts.get(region)
+                    if facts_queue is None:
+                        facts_queue = _followup_facts[region] = _build_followup_facts(region)
+                    if facts_queue:
+                        followup_response = f"Here's more about the {region} 🌊\n\n• {facts_queue.popleft()}\n\n"
+                        followup_response += "Would you like to hear more?"
+                        conversation_history.append({
+                            "user": user_input,
+                            "assistant": followup_response,
+                            "sentiment": sentiment['emotion'],
+                            "region": region
+                        })
+                        return {"summary": followup_response, "plot": None}
+                user_input = f"{user_input} about {region}"
+                user_lower = f"{user_lower} about {region.lower()}"       
         # Extract region from query
-        region = None
-        for known_region in OCEAN_KNOWLEDGE.keys():
-            if known_region.lower() in user_input.lower():
-                region = known_region
-                break  
+        region = detect_region(user_lower)
         # Default to Indian Ocean if no region specified
         if not region:
          region = "Indian Ocean"   
+        # A fresh question restarts the templated follow-up facts for its region
+        if not sentiment["is_followup"]:
+            _followup_facts.pop(region, None)
         # Get comprehensive data
         ocean_data = get_ocean_data(region, "comprehensive")
-        deployment_data = get_deployment_data(engine, region)        
+        if deployment_future is not None and region == prefetch_region:
+            deployment_data = deployment_future.result()
+        else:
+            deployment_data = get_deployment_data(engine, region)        
+        if stream:
+            chunks = stream_intelligent_response(
+                user_input, ocean_data, deployment_data, sentiment, conversation_history
+            )
+            def _stream_and_record():
+                parts = []
+                for chunk in chunks:
+                    parts.append(chunk)
+                    yield chunk
+                conversation_history.append({
+                    "user": user_input,
+                    "assistant": "".join(parts),
+                    "sentiment": sentiment['emotion'],
+                    "region": region
+                })
+            return {"summary": _stream_and_record(), "plot": None}
         # Generate intelligent response
         response_text = generate_intelligent_response(
             user_input, ocean_data, deployment_data, sentiment, conversation_history
@@ -456,9 +693,6 @@ def answer_query(user_input: str):
             "sentiment": sentiment['emotion'],
             "region": region
         })        
-        # Manage history size
-        if len(conversation_history) > MAX_HISTORY:
-            conversation_history.pop(0)       
         return {"summary": response_text, "plot": None}     
     except Exception as e:
         error_msg = f"I encountered an issue: {str(e)}. Let me try to help you differently. "
@@ -468,7 +702,7 @@ def answer_query(user_input: str):
 if __name__ == "__main__":
     print("🌊 NeptuneAI - Comprehensive Ocean Intelligence System")
     print("=" * 60)
-    engine = get_db_engine()
+    _engine()
     print("\n System initialized successfully!")
     print("\n I can answer questions about:")
     print("  • Ocean depths, temperatures, and salinity")
@@ -488,5 +722,12 @@ if __name__ == "__main__":
             break       
         if user_q.strip() == "":
             continue        
-        response_data = answer_query(user_q)
-        print(f"\n: {response_data['summary']}\n")
\ No newline at end of file
+        response_data = answer_query(user_q, stream=True)
+        summary = response_data['summary']
+        if isinstance(summary, str):
+            print(f"\n: {summary}\n")
+        else:
+            print("\n: ", end="", flush=True)
+            for chunk in summary:
+                print(chunk, end="", flush=True)
+            print("\n")
\ No newline at end of file
@@ -3,44 +3,200 @@ Real-Time Ocean Data API Integration Module
 Integrates multiple free ocean data APIs for live oceanographic information
 """
 
-from cmath import cos
+from math import cos, radians
+import asyncio
+import io
+import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
+import numpy as np
 import pandas as pd
-from functools import lru_cache
+from functools import lru_cache, wraps
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
 import os
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Per-endpoint cache lifetimes (seconds), matched to how often each source updates
+BUOY_CACHE_TTL = 600            # NDBC realtime files refresh every ~30 min
+MARINE_CACHE_TTL = 3600
+SST_CACHE_TTL = 3600
+ARGO_CACHE_TTL = 3600
+SEA_LEVEL_CACHE_TTL = 86400     # Satellite sea level changes slowly
+CLIMATE_CACHE_TTL = 86400
+CACHE_MAXSIZE = 1024
+
+# Major NOAA buoy stations with locations
+BUOY_STATIONS = {
+    "46042": (36.785, -122.398),  # Monterey Bay, CA
+    "46047": (32.433, -119.533),  # Tanner Banks, CA
+    "41001": (34.68, -72.73),     # East of Cape Hatteras, NC
+    "51001": (23.445, -162.075),  # NW Hawaii
+    "44025": (40.25, -73.17),     # New York Harbor
+    "42001": (25.897, -89.658),   # Gulf of Mexico
+}
+BUOY_SEARCH_RADIUS_KM = 1000
+
+# NOAA NDBC column -> output field name
+NDBC_FIELD_MAPPING = {
+    "WDIR": "wind_direction",
+    "WSPD": "wind_speed",
+    "WVHT": "wave_height",
+    "DPD": "wave_period",
+    "APD": "avg_wave_period",
+    "PRES": "air_pressure",
+    "ATMP": "air_temperature",
+    "WTMP": "water_temperature",
+    "DEWP": "dew_point"
+}
+NDBC_FIELD_COLUMNS = list(NDBC_FIELD_MAPPING)
+EARTH_RADIUS_KM = 6371.0
+
+
+def _coord_key(lat: float, lon: float, *args, **kwargs) -> tuple:
+    """Cache key quantizing coordinates to ~1 km so nearby queries share entries"""
+    return (round(lat, 2), round(lon, 2)) + args + tuple(sorted(kwargs.items()))
+
+
+def ttl_cached(ttl: int, key=lambda *args, **kwargs: args + tuple(sorted(kwargs.items()))):
+    """
+    Cache successful endpoint responses on the API instance for ``ttl`` seconds
+    
+    Args:
+        ttl: Time-to-live for cached entries in seconds
+        key: Builds the cache key from the method arguments (excluding self)
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache_key = (func.__name__,) + key(*args, **kwargs)
+            now = time.monotonic()
+            with self._cache_lock:
+                entry = self._cache.get(cache_key)
+            if entry and entry[0] > now:
+                return entry[1]
+            
+            result = func(self, *args, **kwargs)
+            
+            # Only successful responses are cached so errors are retried
+            if result.get("status") == "success":
+                with self._cache_lock:
+                    self._cache[cache_key] = (now + ttl, result)
+                    if len(self._cache) > CACHE_MAXSIZE:
+                        self._evict_cache(now)
+            return result
+        return wrapper
+    return decorator
+
+
+@lru_cache(maxsize=4096)
+def _erddap_sst_url(base: str, dataset_id: str, lat: float, lon: float,
+                    radius: float, day: str) -> str:
+    """ERDDAP tabledap SST query URL (coordinates pre-rounded so nearby points share one)"""
+    return (
+        f"{base}/tabledap/{dataset_id}.csv?"
+        f"time,latitude,longitude,sst"
+        f"&latitude>={lat-radius}&latitude<={lat+radius}"
+        f"&longitude>={lon-radius}&longitude<={lon+radius}"
+        f"&time>={day}"
+    )
+
+
+@lru_cache(maxsize=4096)
+def _erddap_argo_url(base: str, lat: float, lon: float, radius_km: float, since: str) -> str:
+    """ERDDAP ARGO query URL for the bounding box around (lat, lon) since a date"""
+    lat_delta = radius_km / 111.0  # 1 degree ≈ 111 km
+    # Cap latitude so the longitude span stays finite near the poles
+    lon_delta = radius_km / (111.0 * cos(radians(min(abs(lat), 89.0))))
+    
+    # ERDDAP constraints go verbatim in the query string; passing them through
+    # requests' params would percent-encode the '&' separators
+    # .csv0 has no header rows, so each line is one profile record
+    return (
+        f"{base}/tabledap/ArgoFloats.csv0?time,latitude,longitude"
+        f"&latitude>={lat-lat_delta}&latitude<={lat+lat_delta}"
+        f"&longitude>={lon-lon_delta}&longitude<={lon+lon_delta}"
+        f"&time>={since}"
+    )
+
+
 class RealTimeOceanDataAPI:
     """
     Integration with multiple free ocean data APIs
     """
     
-    def __init__(self):
-        """Initialize API clients"""
+    # NDBC (header line, units line) -> {field: unit}; stations share a few layouts
+    _UNITS: Dict[tuple, Dict[str, str]] = {}
+    
+    def __init__(self, buoy_search_radius_km: float = BUOY_SEARCH_RADIUS_KM):
+        """
+        Initialize API clients
+        
+        Args:
+            buoy_search_radius_km: Maximum distance to a buoy station for it to be used
+        """
         self.noaa_base = "https://www.ncei.noaa.gov/erddap"
         self.copernicus_base = "https://nrt.cmems-du.eu/thredds"
         self.world_bank_base = "https://api.worldbank.org/v2"
         
         # Cache settings
         self.cache_duration = 3600  # 1 hour cache
+        self._cache: Dict[tuple, tuple] = {}
+        self._cache_lock = threading.Lock()
+        self._validators: Dict[Any, tuple] = {}  # key -> (etag, last_modified, result)
         
-        logger.info("✅ Real-Time Ocean Data API initialized")
+        # Buoy coordinates as arrays for vectorized nearest-station search
+        self._buoy_ids = np.array(list(BUOY_STATIONS))
+        self._buoy_latlon_rad = np.radians(np.array(list(BUOY_STATIONS.values()), dtype=np.float64))
+        self.buoy_search_radius_km = buoy_search_radius_km
+        # No station can be in range beyond this latitude, so skip the search there
+        self._buoy_lat_limit = (max(abs(b_lat) for b_lat, _ in BUOY_STATIONS.values())
+                                + buoy_search_radius_km / 111.0)
+        
+        # Pooled keep-alive session shared by every endpoint call
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504]),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": "NeptuneAI/1.0",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        
+        logger.debug("✅ Real-Time Ocean Data API initialized")
     
     # ==========================================
     # 1. NOAA ERDDAP - Best Free Ocean Data API
     # ==========================================
     
+    @ttl_cached(BUOY_CACHE_TTL)
     def get_noaa_buoy_data(self, station_id: str = "46042", 
-                           days_back: int = 7) -> Dict[str, Any]:
+                           days_back: int = 7,
+                           return_history: bool = False) -> Dict[str, Any]:
         """
         Get real-time buoy data from NOAA NDBC
         
@@ -49,6 +205,7 @@ class RealTimeOceanDataAPI:
         Args:
             station_id: Buoy station ID (e.g., "46042" - Monterey Bay)
             days_back: Number of days of historical data
+            return_history: Include the hourly readings for ``days_back`` days
             
         Returns:
             Dictionary with buoy measurements
@@ -63,48 +220,48 @@ class RealTimeOceanDataAPI:
             # NOAA NDBC Real-time data (FREE)
             url = f"https://www.ndbc.noaa.gov/data/realtime2/{station_id}.txt"
             
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            # Parse NOAA format (space-separated)
-            lines = response.text.strip().split('\n')
+            # Only the latest reading is needed unless history was requested
+            data_rows = days_back * 24 if return_history else 1
+            validator_key = (url, data_rows)
+            response, unchanged = self._conditional_get(url, validator_key, timeout=10, stream=True)
+            if unchanged is not None:
+                return unchanged
+            
+            # Read only the header, units and requested hourly lines, then drop the connection
+            with response:
+                lines = list(islice(
+                    (line for line in response.iter_lines(decode_unicode=True) if line),
+                    2 + data_rows
+                ))
             if len(lines) < 3:
                 return {"error": "No data available"}
             
-            headers = lines[0].split()
-            units = lines[1].split()
-            data_lines = lines[2:min(len(lines), days_back * 24)]  # Hourly data
+            # Hourly data, newest first; MM = Missing data
+            df = pd.read_csv(io.StringIO("\n".join(lines)), sep=r"\s+", skiprows=[1],
+                             na_values=["MM"])
+            timestamps = pd.to_datetime(
+                df[["#YY", "MM", "DD", "hh", "mm"]].rename(columns={
+                    "#YY": "year", "MM": "month", "DD": "day",
+                    "hh": "hour", "mm": "minute"
+                })
+            )
             
-            # Parse latest measurement
-            latest = data_lines[0].split()
+            measurements = df.filter(items=NDBC_FIELD_COLUMNS).rename(columns=NDBC_FIELD_MAPPING)
+            latest = measurements.iloc[0].dropna().astype(float)
+            units = self._ndbc_units(lines[0], lines[1])
             
             result = {
                 "station_id": station_id,
-                "timestamp": f"{latest[0]}-{latest[1]}-{latest[2]} {latest[3]}:{latest[4]}:00",
-                "data": {},
-                "units": {},
+                "timestamp": timestamps.iloc[0].strftime("%Y-%m-%d %H:%M:00"),
+                "data": latest.to_dict(),
+                "units": {field: units[field] for field in latest.index},
                 "status": "success"
             }
-            
-            # Map NOAA fields
-            field_mapping = {
-                "WDIR": "wind_direction",
-                "WSPD": "wind_speed",
-                "WVHT": "wave_height",
-                "DPD": "wave_period",
-                "APD": "avg_wave_period",
-                "PRES": "air_pressure",
-                "ATMP": "air_temperature",
-                "WTMP": "water_temperature",
-                "DEWP": "dew_point"
-            }
-            
-            for i, header in enumerate(headers):
-                if i < len(latest) and header in field_mapping:
-                    value = latest[i]
-                    if value != "MM":  # MM = Missing data
-                        result["data"][field_mapping[header]] = float(value)
-                        result["units"][field_mapping[header]] = units[i] if i < len(units) else ""
+            if return_history:
+                history = measurements.astype(object).where(measurements.notna(), None)
+                history.insert(0, "timestamp", timestamps.dt.strftime("%Y-%m-%d %H:%M:00"))
+                result["history"] = history.to_dict(orient="records")
+            self._remember_validators(validator_key, response, result)
             
             logger.info(f"✅ Retrieved NOAA buoy data for station {station_id}")
             return result
@@ -113,6 +270,21 @@ class RealTimeOceanDataAPI:
             logger.error(f"❌ NOAA buoy data error: {e}")
             return {"error": str(e), "status": "failed"}
     
+    @classmethod
+    def _ndbc_units(cls, header_line: str, units_line: str) -> Dict[str, str]:
+        """Output field -> unit for an NDBC header layout, memoized per layout"""
+        layout = (header_line, units_line)
+        units = cls._UNITS.get(layout)
+        if units is None:
+            unit_by_column = dict(zip(header_line.split(), units_line.split()))
+            units = {
+                field: unit_by_column.get(column, "")
+                for column, field in NDBC_FIELD_MAPPING.items()
+            }
+            cls._UNITS[layout] = units
+        return units
+    
+    @ttl_cached(SST_CACHE_TTL, key=_coord_key)
     def get_sea_surface_temperature(self, lat: float, lon: float, 
                                      radius: float = 1.0) -> Dict[str, Any]:
         """
@@ -130,29 +302,28 @@ class RealTimeOceanDataAPI:
             # NOAA ERDDAP - GHRSST Level 4 (FREE)
             dataset_id = "nesdisVHNSQchlaDaily"
             
-            url = (
-                f"{self.noaa_base}/tabledap/{dataset_id}.json?"
-                f"time,latitude,longitude,sst"
-                f"&latitude>={lat-radius}&latitude<={lat+radius}"
-                f"&longitude>={lon-radius}&longitude<={lon+radius}"
-                f"&time>={datetime.now().isoformat()[:10]}"
-            )
+            url = _erddap_sst_url(self.noaa_base, dataset_id, round(lat, 2), round(lon, 2),
+                                  radius, datetime.now().isoformat()[:10])
             
-            response = requests.get(url, timeout=15)
-            response.raise_for_status()
+            response, unchanged = self._conditional_get(url, url, timeout=15)
+            if unchanged is not None:
+                return unchanged
             
-            data = response.json()
+            # CSV transport: column names, then a units row, then data
+            df = pd.read_csv(io.BytesIO(response.content), skiprows=[1], nrows=1)
             
-            if len(data['table']['rows']) > 0:
-                row = data['table']['rows'][0]
-                return {
+            if len(df) > 0:
+                row = df.iloc[0]
+                result = {
                     "latitude": lat,
                     "longitude": lon,
-                    "sst": row[3],
-                    "timestamp": row[0],
+                    "sst": None if pd.isna(row["sst"]) else float(row["sst"]),
+                    "timestamp": row["time"],
                     "source": "NOAA ERDDAP",
                     "status": "success"
                 }
+                self._remember_validators(url, response, result)
+                return result
             else:
                 return {"error": "No data found for location", "status": "no_data"}
                 
@@ -164,6 +335,7 @@ class RealTimeOceanDataAPI:
     # 2. Open-Meteo Marine API - FREE & RELIABLE
     # ==========================================
     
+    @ttl_cached(MARINE_CACHE_TTL, key=_coord_key)
     def get_marine_weather(self, lat: float, lon: float) -> Dict[str, Any]:
         """
         Get real-time marine weather from Open-Meteo (FREE, NO API KEY)
@@ -189,10 +361,10 @@ class RealTimeOceanDataAPI:
                 "timezone": "auto"
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = _json_loads(response.content)
             
             # Extract current conditions
             current_time = datetime.now().isoformat()
@@ -218,12 +390,14 @@ class RealTimeOceanDataAPI:
                 }
                 
                 # 24-hour forecast
-                for i in range(min(24, len(hourly_data.get("time", [])))):
-                    result["forecast_24h"].append({
-                        "time": hourly_data["time"][i],
-                        "wave_height_m": hourly_data.get("wave_height", [])[i],
-                        "wave_direction_deg": hourly_data.get("wave_direction", [])[i]
-                    })
+                times = hourly_data.get("time", [])[:24]
+                missing = [None] * len(times)
+                result["forecast_24h"] = [
+                    {"time": t, "wave_height_m": h, "wave_direction_deg": d}
+                    for t, h, d in zip(times,
+                                       hourly_data.get("wave_height", missing)[:24],
+                                       hourly_data.get("wave_direction", missing)[:24])
+                ]
             
             logger.info(f"✅ Retrieved marine weather for ({lat}, {lon})")
             return result
@@ -236,6 +410,7 @@ class RealTimeOceanDataAPI:
     # 3. NASA PODAAC - Satellite Ocean Data
     # ==========================================
     
+    @ttl_cached(SEA_LEVEL_CACHE_TTL, key=_coord_key)
     def get_nasa_sea_level(self, lat: float, lon: float) -> Dict[str, Any]:
         """
         Get sea level anomaly data from NASA PODAAC (FREE)
@@ -273,6 +448,7 @@ class RealTimeOceanDataAPI:
     # 4. WorldBank Climate API - Ocean Stats
     # ==========================================
     
+    @ttl_cached(CLIMATE_CACHE_TTL)
     def get_climate_trends(self, country_code: str = "USA") -> Dict[str, Any]:
         """
         Get ocean climate trends from World Bank Climate API (FREE)
@@ -292,10 +468,10 @@ class RealTimeOceanDataAPI:
                 "per_page": 50
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = _json_loads(response.content)
             
             if len(data) > 1 and data[1]:
                 trends = data[1][:5]  # Last 5 years
@@ -326,6 +502,7 @@ class RealTimeOceanDataAPI:
     # 5. ARGO Float Data (Real Profiles)
     # ==========================================
     
+    @ttl_cached(ARGO_CACHE_TTL, key=_coord_key)
     def get_argo_profiles_nearby(self, lat: float, lon: float, 
                                   radius_km: float = 500) -> Dict[str, Any]:
         """
@@ -341,27 +518,19 @@ class RealTimeOceanDataAPI:
         """
         try:
             # ARGO GDAC ERDDAP endpoint
-            url = f"{self.noaa_base}/tabledap/ArgoFloats.json"
-            
-            # Calculate bounding box
-            lat_delta = radius_km / 111.0  # 1 degree ≈ 111 km
-            lon_delta = radius_km / (111.0 * abs(cos(lat * 3.14159 / 180)))
-            
-            params = {
-                "latitude": f">={lat-lat_delta}&latitude<={lat+lat_delta}",
-                "longitude": f">={lon-lon_delta}&longitude<={lon+lon_delta}",
-                "time": f">={datetime.now() - timedelta(days=30):%Y-%m-%d}"
-            }
+            url = _erddap_argo_url(self.noaa_base, round(lat, 2), round(lon, 2), radius_km,
+                                   f"{datetime.now() - timedelta(days=30):%Y-%m-%d}")
             
-            response = requests.get(url, params=params, timeout=15)
+            response = self.session.get(url, timeout=15)
             
             if response.status_code == 200:
-                data = response.json()
+                body = response.content
+                profiles_found = body.count(b"\n") + (1 if body and not body.endswith(b"\n") else 0)
                 
                 result = {
                     "location": {"latitude": lat, "longitude": lon},
                     "search_radius_km": radius_km,
-                    "profiles_found": len(data.get("table", {}).get("rows", [])),
+                    "profiles_found": profiles_found,
                     "source": "ARGO GDAC",
                     "status": "success"
                 }
@@ -393,6 +562,64 @@ class RealTimeOceanDataAPI:
         """
         logger.info(f"🌊 Generating comprehensive ocean report for ({lat}, {lon})")
         
+        # Independent I/O-bound sources run in parallel on the shared session
+        nearest_buoy = self._find_nearest_buoy(lat, lon)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            marine_future = executor.submit(self.get_marine_weather, lat, lon)
+            buoy_future = executor.submit(self.get_noaa_buoy_data, nearest_buoy) if nearest_buoy else None
+            sea_level_future = executor.submit(self.get_nasa_sea_level, lat, lon)
+            argo_future = executor.submit(self.get_argo_profiles_nearby, lat, lon)
+            
+            marine_data = marine_future.result()
+            buoy_data = buoy_future.result() if buoy_future else None
+            sea_level = sea_level_future.result()
+            argo_data = argo_future.result()
+        
+        return self._assemble_report(lat, lon, marine_data, nearest_buoy,
+                                     buoy_data, sea_level, argo_data)
+    
+    async def get_comprehensive_ocean_report_async(self, lat: float, lon: float,
+                                                   include_forecast: bool = True) -> Dict[str, Any]:
+        """
+        Async variant of get_comprehensive_ocean_report for event-loop callers
+        
+        The independent sub-API calls run concurrently (on worker threads sharing
+        the pooled session), so latency is the slowest source rather than the sum.
+        
+        Args:
+            lat: Latitude
+            lon: Longitude
+            include_forecast: Include forecast data
+            
+        Returns:
+            Comprehensive ocean report
+        """
+        logger.info(f"🌊 Generating comprehensive ocean report for ({lat}, {lon})")
+        
+        nearest_buoy = self._find_nearest_buoy(lat, lon)
+        
+        async def _no_buoy():
+            return None
+        
+        results = await asyncio.gather(
+            asyncio.to_thread(self.get_marine_weather, lat, lon),
+            asyncio.to_thread(self.get_noaa_buoy_data, nearest_buoy) if nearest_buoy else _no_buoy(),
+            asyncio.to_thread(self.get_nasa_sea_level, lat, lon),
+            asyncio.to_thread(self.get_argo_profiles_nearby, lat, lon),
+            return_exceptions=True
+        )
+        marine_data, buoy_data, sea_level, argo_data = (
+            {"error": str(r), "status": "failed"} if isinstance(r, Exception) else r
+            for r in results
+        )
+        
+        return self._assemble_report(lat, lon, marine_data, nearest_buoy,
+                                     buoy_data, sea_level, argo_data)
+    
+    def _assemble_report(self, lat: float, lon: float, marine_data: Dict[str, Any],
+                         nearest_buoy: Optional[str], buoy_data: Optional[Dict[str, Any]],
+                         sea_level: Dict[str, Any], argo_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine sub-API results into the comprehensive report structure"""
         report = {
             "location": {
                 "latitude": lat,
@@ -405,27 +632,21 @@ class RealTimeOceanDataAPI:
         }
         
         # 1. Marine weather (waves, currents)
-        marine_data = self.get_marine_weather(lat, lon)
         if marine_data.get("status") == "success":
             report["real_time_data"]["marine_weather"] = marine_data
             report["data_sources"].append("Open-Meteo Marine API")
         
-        # 2. Try to find nearest buoy
-        nearest_buoy = self._find_nearest_buoy(lat, lon)
-        if nearest_buoy:
-            buoy_data = self.get_noaa_buoy_data(nearest_buoy)
-            if buoy_data.get("status") == "success":
-                report["real_time_data"]["buoy_observations"] = buoy_data
-                report["data_sources"].append(f"NOAA Buoy {nearest_buoy}")
+        # 2. Nearest buoy
+        if buoy_data and buoy_data.get("status") == "success":
+            report["real_time_data"]["buoy_observations"] = buoy_data
+            report["data_sources"].append(f"NOAA Buoy {nearest_buoy}")
         
         # 3. Sea level trends
-        sea_level = self.get_nasa_sea_level(lat, lon)
         if sea_level.get("status") == "success":
             report["real_time_data"]["sea_level"] = sea_level
             report["data_sources"].append("NASA PODAAC")
         
         # 4. ARGO float data
-        argo_data = self.get_argo_profiles_nearby(lat, lon)
         if argo_data.get("status") == "success":
             report["real_time_data"]["argo_floats"] = argo_data
             report["data_sources"].append("ARGO GDAC")
@@ -433,35 +654,110 @@ class RealTimeOceanDataAPI:
         logger.info(f"✅ Report generated with {len(report['data_sources'])} sources")
         return report
     
-    def _find_nearest_buoy(self, lat: float, lon: float) -> Optional[str]:
-        """Find nearest NOAA buoy station"""
-        # Major buoy stations with locations
-        buoys = {
-            "46042": (36.785, -122.398),  # Monterey Bay, CA
-            "46047": (32.433, -119.533),  # Tanner Banks, CA
-            "41001": (34.68, -72.73),     # East of Cape Hatteras, NC
-            "51001": (23.445, -162.075),  # NW Hawaii
-            "44025": (40.25, -73.17),     # New York Harbor
-            "42001": (25.897, -89.658),   # Gulf of Mexico
-        }
+    def _evict_cache(self, now: float) -> None:
+        """Drop expired entries, then the oldest ones, until the cache fits (lock held)"""
+        for cache_key in [k for k, (expires_at, _) in self._cache.items() if expires_at <= now]:
+            del self._cache[cache_key]
+        while len(self._cache) > CACHE_MAXSIZE:
+            del self._cache[next(iter(self._cache))]
+    
+    def clear_cache(self) -> None:
+        """Invalidate all cached endpoint responses"""
+        with self._cache_lock:
+            self._cache.clear()
+            self._validators.clear()
+    
+    def _conditional_get(self, url: str, validator_key: Any, timeout: int, **kwargs):
+        """
+        GET with If-None-Match / If-Modified-Since when a previous response is known
+        
+        Returns:
+            (response, None) for a fresh body, or (None, previous_result) on 304
+        """
+        with self._cache_lock:
+            previous = self._validators.get(validator_key)
         
-        # Simple distance calculation
-        min_dist = float('inf')
-        nearest = None
+        headers = {}
+        if previous:
+            etag, last_modified, _ = previous
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
         
-        for buoy_id, (b_lat, b_lon) in buoys.items():
-            dist = ((lat - b_lat) ** 2 + (lon - b_lon) ** 2) ** 0.5
-            if dist < min_dist:
-                min_dist = dist
-                nearest = buoy_id
+        response = self.session.get(url, headers=headers, timeout=timeout, **kwargs)
+        if response.status_code == 304 and previous:
+            response.close()
+            return None, previous[2]
+        response.raise_for_status()
+        return response, None
+    
+    def _remember_validators(self, validator_key: Any, response, result: Dict[str, Any]) -> None:
+        """Store the ETag / Last-Modified of a parsed response for later revalidation"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        with self._cache_lock:
+            self._validators[validator_key] = (etag, last_modified, result)
+            if len(self._validators) > CACHE_MAXSIZE:
+                del self._validators[next(iter(self._validators))]
+    
+    def _find_nearest_buoy(self, lat: float, lon: float) -> Optional[str]:
+        """Find nearest NOAA buoy station (great-circle distance)"""
+        if abs(lat) > self._buoy_lat_limit:
+            return None
         
-        return nearest if min_dist < 10 else None  # Within ~10 degrees
+        buoy_lat = self._buoy_latlon_rad[:, 0]
+        dlat = buoy_lat - np.radians(lat)
+        dlon = self._buoy_latlon_rad[:, 1] - np.radians(lon)
+        a = np.sin(dlat / 2) ** 2 + np.cos(np.radians(lat)) * np.cos(buoy_lat) * np.sin(dlon / 2) ** 2
+        dist_km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+        
+        nearest = int(np.argmin(dist_km))
+        return str(self._buoy_ids[nearest]) if dist_km[nearest] < self.buoy_search_radius_km else None
 
 
 # ==========================================
 # Integration with your RAG Pipeline
 # ==========================================
 
+# Default locations for popular regions
+REGION_COORDS = {
+    "indian ocean": (0.0, 80.0),
+    "pacific ocean": (0.0, -140.0),
+    "atlantic ocean": (30.0, -40.0),
+    "bay of bengal": (15.0, 88.0),
+    "arabian sea": (15.0, 65.0),
+    "monterey bay": (36.8, -122.4),
+}
+# A query naming several regions resolves to the one listed first above
+_REGION_PRIORITY = {region: rank for rank, region in enumerate(REGION_COORDS)}
+
+# Query intent -> trigger keywords (substring matches)
+INTENT_KEYWORDS = {
+    "realtime": ("current", "now", "today", "real-time", "live"),
+    "wave": ("wave", "surf", "swell"),
+    "buoy": ("buoy", "station", "observation"),
+    "report": ("comprehensive", "report", "all data"),
+}
+_INTENT_BY_KEYWORD = {kw: intent for intent, kws in INTENT_KEYWORDS.items() for kw in kws}
+
+# One alternation over regions and intent keywords; the lookahead reports
+# overlapping matches so every keyword present is seen in a single scan
+_QUERY_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(
+        re.escape(kw) for kw in sorted([*REGION_COORDS, *_INTENT_BY_KEYWORD], key=len, reverse=True)
+    ) + "))"
+)
+
+
+@lru_cache(maxsize=1)
+def _get_api() -> RealTimeOceanDataAPI:
+    """Shared API instance so its connection pool persists across queries"""
+    return RealTimeOceanDataAPI()
+
+
 def integrate_realtime_data_with_query(user_query: str, lat: float = None, 
                                        lon: float = None) -> Dict[str, Any]:
     """
@@ -475,48 +771,48 @@ def integrate_realtime_data_with_query(user_query: str, lat: float = None,
     Returns:
         Enhanced response with real-time data
     """
-    api = RealTimeOceanDataAPI()
+    api = _get_api()
     
     query_lower = user_query.lower()
     
-    # Extract coordinates from query if not provided
-    if not lat or not lon:
-        # Default locations for popular regions
-        region_coords = {
-            "indian ocean": (0.0, 80.0),
-            "pacific ocean": (0.0, -140.0),
-            "atlantic ocean": (30.0, -40.0),
-            "bay of bengal": (15.0, 88.0),
-            "arabian sea": (15.0, 65.0),
-            "monterey bay": (36.8, -122.4),
-        }
-        
-        for region, coords in region_coords.items():
-            if region in query_lower:
-                lat, lon = coords
-                break
+    # Single pass over the query collects every region and intent keyword
+    regions = set()
+    intents = set()
+    for match in _QUERY_KEYWORD_RE.finditer(query_lower):
+        keyword = match.group(1)
+        if keyword in REGION_COORDS:
+            regions.add(keyword)
         else:
-            lat, lon = 0.0, 0.0  # Default equator
+            intents.add(_INTENT_BY_KEYWORD[keyword])
+    region = min(regions, key=_REGION_PRIORITY.__getitem__, default=None)
     
     result = {"real_time_data": None, "enhanced_response": ""}
     
-    # Detect query intent
-    if any(word in query_lower for word in ["current", "now", "today", "real-time", "live"]):
-        # User wants real-time data
-        if any(word in query_lower for word in ["wave", "surf", "swell"]):
-            result["real_time_data"] = api.get_marine_weather(lat, lon)
-            result["enhanced_response"] = f"🌊 Real-time wave conditions at ({lat:.2f}, {lon:.2f}):"
-            
-        elif any(word in query_lower for word in ["buoy", "station", "observation"]):
-            buoy = api._find_nearest_buoy(lat, lon)
-            if buoy:
-                result["real_time_data"] = api.get_noaa_buoy_data(buoy)
-                result["enhanced_response"] = f"📡 Latest buoy observation from station {buoy}:"
-        
-        elif any(word in query_lower for word in ["comprehensive", "report", "all data"]):
-            result["real_time_data"] = api.get_comprehensive_ocean_report(lat, lon)
-            result["enhanced_response"] = f"📊 Comprehensive ocean report for ({lat:.2f}, {lon:.2f}):"
+    # Nothing to fetch unless the user asked for real-time data
+    if "realtime" not in intents:
+        return result
+    
+    # Extract coordinates from query if not provided
+    if not lat or not lon:
+        lat, lon = REGION_COORDS[region] if region else (0.0, 0.0)  # Default equator
+    
+    # Dispatch on the detected intent
+    if "wave" in intents:
+        result["real_time_data"] = api.get_marine_weather(lat, lon)
+        result["enhanced_response"] = f"🌊 Real-time wave conditions at ({lat:.2f}, {lon:.2f}):"
         
-        else:
-            # Default: marine weather
-            result["real_time_data"] = api.get_marine_weather(lat, lon)
\ No newline at end of file
+    elif "buoy" in intents:
+        buoy = api._find_nearest_buoy(lat, lon)
+        if buoy:
+            result["real_time_data"] = api.get_noaa_buoy_data(buoy)
+            result["enhanced_response"] = f"📡 Latest buoy observation from station {buoy}:"
+    
+    elif "report" in intents:
+        result["real_time_data"] = api.get_comprehensive_ocean_report(lat, lon)
+        result["enhanced_response"] = f"📊 Comprehensive ocean report for ({lat:.2f}, {lon:.2f}):"
+    
+    else:
+        # Default: marine weather
+        result["real_time_data"] = api.get_marine_weather(lat, lon)
+    
+    return result
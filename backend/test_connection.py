@@ -16,6 +16,9 @@ except ImportError as e:
 
 TABLE_NAME = "oceanbench_data"
 SAMPLE_ROWS = 5  
+CHUNK_ROWS = 10_000
+# Arrow-backed columns (pandas >= 2.0) avoid numpy object columns for strings
+READ_SQL_KWARGS = {"dtype_backend": "pyarrow"} if int(pd.__version__.split(".")[0]) >= 2 else {}
 
 def test_database_connection(engine: Engine):
     """Test basic database connectivity"""
@@ -96,7 +99,11 @@ def fetch_sample(engine: Engine, table_name: str = TABLE_NAME, limit: int = SAMP
                 cols = "*"
             
             query = text(f'SELECT {cols} FROM "{table_name}" LIMIT :limit')
-            df = pd.read_sql(query, connection, params={"limit": limit})
+            if limit > 1000:
+                chunks = pd.read_sql(query, connection, params={"limit": limit},
+                                     chunksize=CHUNK_ROWS, **READ_SQL_KWARGS)
+                return pd.concat(chunks, ignore_index=True)
+            df = pd.read_sql(query, connection, params={"limit": limit}, **READ_SQL_KWARGS)
             return df
     except Exception as e:
         print(f" Query failed: {e}")
@@ -141,8 +148,8 @@ def test_specific_queries(engine: Engine, table_name: str):
     for test in test_queries:
         try:
             with engine.connect() as connection:
-                result = connection.execute(text(test["query"]))
-                rows = result.fetchall()
+                df = pd.read_sql_query(text(test["query"]), connection, **READ_SQL_KWARGS)
+                rows = list(df.itertuples(index=False, name=None))
                 print(f"    {test['name']}: {len(rows)} rows returned")
                 
                 if test["name"] in ["Get unique regions", "Get unique oceans"] and rows:
@@ -0,0 +1,49 @@
+"""
+Tests for the ERDDAP query helpers of the real-time ocean data API
+
+Run from the backend directory with: python -m pytest test_realtime_ocean_api.py
+"""
+
+import math
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from realtime_ocean_api import _erddap_argo_url
+
+BASE = "https://www.ncei.noaa.gov/erddap"
+RADIUS_KM = 500.0
+BOUND_RE = re.compile(r"&(latitude|longitude)([<>]=)(-?[\d.e+-]+)")
+
+
+def url_bounds(url: str) -> dict:
+    """Parse the (min, max) constraints of each coordinate out of an ERDDAP URL"""
+    bounds = {}
+    for name, op, value in BOUND_RE.findall(url):
+        low, high = bounds.get(name, (None, None))
+        bounds[name] = (float(value), high) if op == ">=" else (low, float(value))
+    return bounds
+
+
+@pytest.mark.parametrize("lat, lon, expected_lon_delta", [
+    (0.0, 60.0, RADIUS_KM / 111.0),
+    (90.0, 60.0, RADIUS_KM / (111.0 * math.cos(math.radians(89.0)))),
+    (-90.0, -150.0, RADIUS_KM / (111.0 * math.cos(math.radians(89.0)))),
+    (89.9, 10.0, RADIUS_KM / (111.0 * math.cos(math.radians(89.0)))),
+])
+def test_argo_url_bounds_are_real_floats(lat, lon, expected_lon_delta):
+    url = _erddap_argo_url(BASE, lat, lon, RADIUS_KM, "2024-01-01T00:00:00Z")
+    # A complex lon_delta would be formatted as "(a+bj)" in the URL
+    assert "j" not in url.split("?", 1)[1]
+
+    bounds = url_bounds(url)
+    lat_delta = RADIUS_KM / 111.0
+    assert bounds["latitude"] == pytest.approx((lat - lat_delta, lat + lat_delta))
+    lon_min, lon_max = bounds["longitude"]
+    assert math.isfinite(lon_min) and math.isfinite(lon_max)
+    assert (lon_max - lon_min) / 2 == pytest.approx(expected_lon_delta)
+    assert (lon_max + lon_min) / 2 == pytest.approx(lon)
@@ -0,0 +1,97 @@
+"""
+Regression tests for the FAISS vector store
+
+Run from the backend directory with: python -m pytest test_vector_store.py
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import faiss
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import vector_store
+from vector_store import ARGOVectorStore
+
+DIMENSION = 8
+
+
+class HashEncoder:
+    """Deterministic stand-in for SentenceTransformer, so tests need no model download"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        single = isinstance(texts, str)
+        vectors = np.stack([
+            np.random.default_rng(int(hashlib.md5(text.encode()).hexdigest()[:8], 16))
+            .standard_normal(DIMENSION).astype(np.float32)
+            for text in ([texts] if single else texts)
+        ]) if texts else np.empty((0, DIMENSION), np.float32)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture(autouse=True)
+def hash_encoder(monkeypatch):
+    monkeypatch.setattr(vector_store, "SentenceTransformer", HashEncoder)
+
+
+def open_store(path) -> ARGOVectorStore:
+    return ARGOVectorStore(str(path), dimension=DIMENSION, index_type="flat")
+
+
+def write_legacy_store(path, n_vectors: int, n_metadata: int) -> list:
+    """Write a pre-ID-mapping store: a bare IndexFlatIP and a metadata.json list"""
+    contents = [f"Location: {i}.00°N, 60.00°E" for i in range(max(n_vectors, n_metadata))]
+    index = faiss.IndexFlatIP(DIMENSION)
+    if n_vectors:
+        index.add(HashEncoder().encode(contents[:n_vectors], normalize_embeddings=True))
+    faiss.write_index(index, str(path / "faiss_index.bin"))
+    metadata = [{'id': hashlib.md5(content.encode()).hexdigest(), 'content': content,
+                 'metadata': {}, 'doc_type': 'profile'}
+                for content in contents[:n_metadata]]
+    with open(path / "metadata.json", 'w') as f:
+        json.dump(metadata, f)
+    return metadata
+
+
+@pytest.mark.parametrize("n_vectors, n_metadata", [(1, 3), (3, 1), (2, 2)])
+def test_legacy_store_with_mismatched_counts_loads(tmp_path, n_vectors, n_metadata):
+    metadata = write_legacy_store(tmp_path, n_vectors, n_metadata)
+    store = open_store(tmp_path)
+
+    paired = min(n_vectors, n_metadata)
+    assert len(store.metadata) == paired
+    assert store.index.ntotal == paired
+    assert store._dirty
+    results = store.search(metadata[0]['content'], k=1)
+    assert results[0]['id'] == metadata[0]['id']
+
+    store._save_index(wait=True)
+    reloaded = open_store(tmp_path)
+    assert [doc['id'] for doc in reloaded.metadata] == [doc['id'] for doc in metadata[:paired]]
+    assert not reloaded._dirty
+
+
+def test_failed_load_leaves_store_untouched(tmp_path):
+    # An entry without an ID fails the migration after the metadata is read
+    metadata = write_legacy_store(tmp_path, 1, 1)
+    del metadata[0]['id']
+    with open(tmp_path / "metadata.json", 'w') as f:
+        json.dump(metadata, f)
+    index_bytes = (tmp_path / "faiss_index.bin").read_bytes()
+    store = open_store(tmp_path)
+
+    assert store.metadata == []
+    assert not store._dirty
+    store._save_index(wait=True)
+    assert (tmp_path / "metadata.json").exists()
+    assert (tmp_path / "faiss_index.bin").read_bytes() == index_bytes
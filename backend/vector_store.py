@@ -6,30 +6,126 @@ Implements FAISS-based vector storage for metadata and summaries
 import os
 import json
 import pickle
+import threading
+import time
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union
 import logging
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import wraps
 import faiss
 from sentence_transformers import SentenceTransformer
 import hashlib
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import orjson
+
+    def _dumps(obj, indent: bool = False) -> bytes:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=str, option=option)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj, indent: bool = False) -> bytes:
+        return json.dumps(obj, default=str, indent=2 if indent else None).encode()
+
+    _loads = json.loads
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# HNSW graph parameters: neighbours per node, build-time and query-time beam width
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 100
+HNSW_EF_SEARCH = 64
+
+# HNSW cannot remove vectors, so deletes are tombstoned and the graph is
+# rebuilt once this fraction of the indexed vectors is dead
+TOMBSTONE_REBUILD_RATIO = 0.2
+
+# IVFPQ compresses each vector to IVFPQ_M codes of IVFPQ_NBITS bits; vectors
+# are staged in a flat index until there are enough to train the quantizers
+IVFPQ_TRAIN_SIZE = 10000
+IVFPQ_M = 16
+IVFPQ_NBITS = 8
+
+INDEX_TYPES = ("hnsw", "ivfpq", "flat")
+
+# Flat stores larger than this are split into shards of about this many
+# vectors, searched on parallel threads (a single-query flat search is serial)
+SHARD_SIZE = 100_000
+
+# Sentences per forward pass when embedding a batch of documents
+ENCODE_BATCH_SIZE = 64
+
+# Queued vectors are added to the index once this many are pending, and
+# always before the index is searched, saved or modified
+ADD_FLUSH_SIZE = 1024
+
+# Minimum spacing between background saves; saves requested in between coalesce
+SAVE_INTERVAL_SECONDS = 5.0
+
+# Dynamically int8-quantized ONNX export shipped with the sentence-transformers
+# models; needs sentence-transformers>=3.2 and optimum[onnxruntime]
+ONNX_QUANTIZED_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+ENCODER_BACKENDS = ("torch", "onnx")
+
+# Content hashers for document IDs. IDs only deduplicate content, so a fast
+# non-cryptographic hash is enough; md5 is kept to open stores written with it
+HASHERS = {
+    "md5": lambda data: hashlib.md5(data).hexdigest(),
+    "blake2b": lambda data: hashlib.blake2b(data, digest_size=16).hexdigest(),
+}
+if xxhash is not None:
+    HASHERS["xxh3_128"] = xxhash.xxh3_128_hexdigest
+DEFAULT_HASH_ALGO = "xxh3_128" if xxhash is not None else "blake2b"
+
+# Fields of every stored document, in on-disk column order
+METADATA_COLUMNS = ['id', 'vector_id', 'content', 'metadata', 'doc_type', 'created_at', 'updated_at']
+
+# Measurement columns embedded in profile content and copied into metadata
+OCEAN_VARS = ('temperature', 'salinity', 'pressure')
+
+def _format_2f(values: pd.Series) -> pd.Series:
+    """Format a numeric column with two decimals ('%' on native floats beats Series.map)"""
+    return pd.Series(['%.2f' % value for value in values.tolist()], index=values.index, dtype=object)
+
+def _synchronized(method):
+    """Run a store method under the store's lock so background saves see a consistent state"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class ARGOVectorStore:
     """
     Vector store for ARGO ocean data using FAISS
     Stores metadata and summaries for semantic search
+
+    Documents should be added in batches (add_profile_data /
+    add_documents_batch): SentenceTransformer sorts a list of sentences by
+    length before batching, so similar-length contents share a forward pass
+    with little padding. Calling add_document in a loop gives that up.
     """
     
     def __init__(self, 
                  index_path: str = "vector_index",
                  model_name: str = "all-MiniLM-L6-v2",
-                 dimension: int = 384):
+                 dimension: int = 384,
+                 index_type: str = "hnsw",
+                 backend: str = "torch",
+                 mmap_index: bool = False):
         """
         Initialize the vector store
         
@@ -37,77 +133,476 @@ class ARGOVectorStore:
             index_path: Path to store the FAISS index
             model_name: Sentence transformer model name
             dimension: Embedding dimension
+            index_type: "hnsw" for fast in-memory graph search, "ivfpq" for
+                compressed vectors on large stores, or "flat" for exact search
+            backend: "torch" for the FP32 PyTorch encoder, or "onnx" for the
+                int8-quantized ONNX Runtime encoder on CPU-only servers
+            mmap_index: Memory-map the saved index's vectors read-only so
+                startup does not read them all from disk; the index is read
+                into memory the first time the store is modified
         """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index_type {index_type!r}, expected one of {INDEX_TYPES}")
+        if backend not in ENCODER_BACKENDS:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {ENCODER_BACKENDS}")
+
         self.index_path = Path(index_path)
         self.index_path.mkdir(exist_ok=True)
         
         self.dimension = dimension
         self.model_name = model_name
+        self.index_type = index_type
+        self.mmap_index = mmap_index
+        # Overridden by _load_index for stores written with another hash
+        self.hash_algo = DEFAULT_HASH_ALGO
+        # Flat and IVF indexes (and the encoder) run on the GPU when FAISS sees one
+        self._gpu_resources = faiss.StandardGpuResources() if faiss.get_num_gpus() > 0 else None
         
         # Initialize sentence transformer
-        try:
-            self.encoder = SentenceTransformer(model_name)
-            logger.info(f"Loaded sentence transformer: {model_name}")
-        except Exception as e:
-            logger.error(f"Failed to load sentence transformer: {e}")
-            raise
+        self.encoder = None
+        if backend == "onnx":
+            try:
+                self.encoder = SentenceTransformer(
+                    model_name,
+                    backend="onnx",
+                    model_kwargs={"file_name": ONNX_QUANTIZED_FILE,
+                                  "provider": "CPUExecutionProvider"}
+                )
+                logger.info(f"Loaded int8 ONNX sentence transformer: {model_name}")
+            except Exception as e:
+                logger.warning(f"ONNX encoder unavailable, falling back to PyTorch: {e}")
+        if self.encoder is None:
+            try:
+                self.encoder = SentenceTransformer(model_name,
+                                                   device="cuda" if self._gpu_resources else None)
+                logger.info(f"Loaded sentence transformer: {model_name}")
+            except Exception as e:
+                logger.error(f"Failed to load sentence transformer: {e}")
+                raise
         
         # Initialize FAISS index
-        self.index = faiss.IndexFlatIP(dimension) # Inner product for cosine similarity
+        self.index = self._new_index()
+        # Set while self.index reads its vectors from the mapped index file
+        self._index_mmapped = False
         self.metadata = []
         self.id_to_metadata = {}
+        # FAISS IDs are stable per document, so metadata positions can move
+        self._vector_positions: Dict[int, int] = {}
+        # FAISS IDs of deleted documents still present in the index
+        self._tombstones = set()
+        # FAISS ID selectors for doc_types searches, keyed by the sorted types
+        self._selector_cache: Dict[Tuple[str, ...], faiss.IDSelector] = {}
+        # Embeddings and FAISS IDs waiting to be added to the index
+        self._pending_vectors: List[np.ndarray] = []
+        self._pending_ids: List[np.ndarray] = []
+        self._pending_count = 0
+
+        # Saves run on one background thread; _dirty marks unsaved changes
+        self._lock = threading.RLock()
+        self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-store-save")
+        self._save_future: Optional[Future] = None
+        self._snapshot_pending = False
+        self._last_save = float('-inf')
+        self._dirty = False
         
         # Load existing index if available
         self._load_index()
     
+    def _encode(self, texts: Union[str, List[str]], **kwargs) -> np.ndarray:
+        """
+        Embed and L2-normalize texts with whichever encoder backend was loaded
+
+        A single string gives a 1-D float32 vector, a list a 2-D matrix.
+        Normalization happens inside the encoder, so inner product == cosine.
+        """
+        return self.encoder.encode(texts, convert_to_numpy=True, normalize_embeddings=True,
+                                   show_progress_bar=False, **kwargs)
+
+    def _new_index(self):
+        """
+        Create an empty ID-mapped index
+
+        Vectors are L2-normalized, so inner product is cosine similarity and
+        L2 distance ranks identically (||a - b||^2 = 2 - 2 a.b). Exact indexes
+        use the L2 kernel, the most tuned flat path in FAISS; search() converts
+        the distances back to cosine scores.
+        """
+        if self.index_type in ("ivfpq", "flat"):
+            # For ivfpq this is a staging index until _maybe_train has enough vectors
+            return self._to_device(faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension)))
+        index = faiss.IndexHNSWFlat(self.dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return faiss.IndexIDMap2(index)
+
+    def _to_device(self, index):
+        """Move an ID-mapped index to the GPU when available; HNSW has no GPU version"""
+        if self._gpu_resources is None or isinstance(faiss.downcast_index(index.index), faiss.IndexHNSW):
+            return index
+        try:
+            return faiss.index_cpu_to_gpu(self._gpu_resources, 0, index)
+        except RuntimeError as e:
+            logger.warning(f"Keeping FAISS index on CPU: {e}")
+            return index
+
+    def _use_shards(self, n: int) -> bool:
+        """Whether an exact CPU index of n vectors should be sharded"""
+        return self.index_type == "flat" and self._gpu_resources is None and n > SHARD_SIZE
+
+    def _shard(self, vectors: np.ndarray, vector_ids: np.ndarray):
+        """
+        Split vectors across flat shards searched on one thread each
+
+        Shards keep their own ID maps (successive_ids=False), so search
+        returns document vector IDs directly; adds are split evenly across
+        the shards. IndexShards cannot remove, reconstruct or serialize, so
+        deletes are tombstoned and _cpu_index merges the shards back.
+        """
+        index = faiss.IndexShards(self.dimension, True, False)
+        for _ in range(-(-len(vector_ids) // SHARD_SIZE)):
+            index.add_shard(faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension)))
+        index.add_with_ids(vectors, vector_ids)
+        logger.info(f"Split {len(vector_ids)} vectors into {index.count()} index shards")
+        return index
+
+    def _shards(self) -> List:
+        """Return the ID-mapped indexes making up self.index"""
+        if isinstance(self.index, faiss.IndexShards):
+            return [faiss.downcast_index(self.index.at(i)) for i in range(self.index.count())]
+        return [self.index]
+
+    def _index_ids(self) -> np.ndarray:
+        """Return the vector IDs held by the index, live or tombstoned"""
+        return np.concatenate([faiss.vector_to_array(shard.id_map) for shard in self._shards()])
+
+    def _cpu_index(self):
+        """Return the index itself, or a single CPU copy of it if it is sharded or on the GPU"""
+        if isinstance(self.index, faiss.IndexShards):
+            index = faiss.IndexIDMap2(faiss.IndexFlatL2(self.dimension))
+            for shard in self._shards():
+                index.add_with_ids(shard.index.reconstruct_n(0, shard.ntotal), faiss.vector_to_array(shard.id_map))
+            return index
+        if not type(faiss.downcast_index(self.index.index)).__name__.startswith("Gpu"):
+            return self.index
+        index = faiss.index_gpu_to_cpu(self.index)
+        base = faiss.downcast_index(index.index)
+        if isinstance(base, faiss.IndexIVF):
+            base.make_direct_map()
+        return index
+
+    def _maybe_train(self):
+        """Swap the flat staging index for a trained IVFPQ index once it is large enough"""
+        if (self.index_type != "ivfpq"
+                or not isinstance(faiss.downcast_index(self.index.index),
+                                  (faiss.IndexFlat, getattr(faiss, "GpuIndexFlat", faiss.IndexFlat)))
+                or self.index.ntotal < IVFPQ_TRAIN_SIZE):
+            return
+        vectors = self.index.index.reconstruct_n(0, self.index.ntotal)
+        vector_ids = faiss.vector_to_array(self.index.id_map)
+        nlist = max(int(2 * np.sqrt(len(vectors))), 20)
+        quantizer = faiss.IndexFlatIP(self.dimension)
+        ivfpq = faiss.IndexIVFPQ(quantizer, self.dimension, nlist, IVFPQ_M, IVFPQ_NBITS,
+                                 faiss.METRIC_INNER_PRODUCT)
+        try:
+            ivfpq.train(vectors)
+        except RuntimeError as e:
+            logger.warning(f"IVFPQ training failed, keeping flat index: {e}")
+            return
+        ivfpq.nprobe = max(min(nlist // 4, 10), 1)
+        # Needed by reconstruct_batch when compacting
+        ivfpq.make_direct_map()
+        index = faiss.IndexIDMap2(ivfpq)
+        index.add_with_ids(vectors, vector_ids)
+        self.index = self._to_device(index)
+        logger.info(f"Trained IVFPQ index with nlist={nlist} on {len(vectors)} vectors")
+
+    @_synchronized
+    def _flush_pending(self):
+        """Add queued embeddings to the index in one call"""
+        if not self._pending_count:
+            return
+        vectors = np.vstack(self._pending_vectors).astype(np.float32, copy=False)
+        vector_ids = np.concatenate(self._pending_ids)
+        self._pending_vectors = []
+        self._pending_ids = []
+        self._pending_count = 0
+        self._materialize_index()
+        self.index.add_with_ids(vectors, vector_ids)
+        self._maybe_train()
+
+    def _rebuild(self, vectors: np.ndarray, vector_ids: np.ndarray):
+        """Replace the index with a fresh one holding only the given vectors"""
+        if self._use_shards(len(vector_ids)):
+            index = self._shard(vectors, vector_ids)
+        else:
+            index = self._new_index()
+            if len(vector_ids):
+                index.add_with_ids(vectors, vector_ids)
+        self.index = index
+        self._index_mmapped = False
+        self._maybe_train()
+
+    @_synchronized
+    def _compact(self):
+        """Rebuild the index without tombstoned vectors"""
+        self._flush_pending()
+        vector_ids = np.array([doc['vector_id'] for doc in self.metadata], dtype='int64')
+        cpu_index = self._cpu_index()
+        vectors = cpu_index.reconstruct_batch(vector_ids) if len(vector_ids) else None
+        base = faiss.downcast_index(cpu_index.index)
+        if isinstance(base, faiss.IndexIVF):
+            # Re-add into an emptied copy that keeps the trained quantizers.
+            # Retraining would fit them to the lossy PQ reconstructions, while
+            # re-encoding a reconstruction with the same quantizers gives back
+            # (almost always) the same codes, so recall does not drift
+            ivf = faiss.clone_index(base)
+            ivf.reset()
+            ivf.make_direct_map()
+            index = faiss.IndexIDMap2(ivf)
+            if len(vector_ids):
+                index.add_with_ids(vectors, vector_ids)
+            self.index = self._to_device(index)
+            self._index_mmapped = False
+        else:
+            self._rebuild(vectors, vector_ids)
+        self._tombstones = set()
+        logger.info(f"Compacted index to {self.index.ntotal} vectors")
+
     def _load_index(self):
         """Load existing FAISS index and metadata"""
         index_file = self.index_path / "faiss_index.bin"
-        metadata_file = self.index_path / "metadata.json"
         
-        if index_file.exists() and metadata_file.exists():
+        if index_file.exists() and self._metadata_file() is not None:
             try:
                 # Load FAISS index
-                self.index = faiss.read_index(str(index_file))
+                self.index = self._read_index(index_file, mmap=self.mmap_index)
                 logger.info(f"Loaded existing FAISS index with {self.index.ntotal} vectors")
+
+                # Keep hashing with the store's algorithm so IDs still match;
+                # stores saved before it was recorded used md5
+                self.hash_algo = self._read_store_info().get('hash_algo', 'md5')
+                if self.hash_algo not in HASHERS:
+                    raise ValueError(f"Store uses unavailable hash {self.hash_algo!r}, install xxhash")
                 
-                # Load metadata
-                with open(metadata_file, 'r') as f:
-                    self.metadata = json.load(f)
-                
+                # Load metadata, rewriting older formats on the next save
+                metadata_file = self._metadata_file()
+                self.metadata = self._read_metadata(metadata_file)
+                migrated = metadata_file.suffix != ".parquet"
+
+                if isinstance(self.index, faiss.IndexIDMap2):
+                    self.index = self._prepare_loaded(self.index)
+                    self._index_mmapped = self.mmap_index
+                    # Mapped stores stay whole, sharding would read every vector
+                    if (not self.mmap_index and self._use_shards(self.index.ntotal)
+                            and isinstance(faiss.downcast_index(self.index.index), faiss.IndexFlat)):
+                        self.index = self._shard(self.index.index.reconstruct_n(0, self.index.ntotal),
+                                                 faiss.vector_to_array(self.index.id_map))
+                else:
+                    # Stores saved before ID mapping used sequential positions
+                    if isinstance(self.index, faiss.IndexIVF):
+                        self.index.make_direct_map()
+                    # Vector i belongs to metadata entry i; entries past the
+                    # shorter of the two have no counterpart and are dropped
+                    paired = min(self.index.ntotal, len(self.metadata))
+                    if paired < max(self.index.ntotal, len(self.metadata)):
+                        logger.warning(f"Dropping {len(self.metadata) - paired} metadata entries and "
+                                       f"{self.index.ntotal - paired} vectors without a counterpart")
+                    vectors = self.index.reconstruct_n(0, paired)
+                    self.metadata = self.metadata[:paired]
+                    for meta in self.metadata:
+                        meta['vector_id'] = self._vector_id(meta['id'])
+                    self._rebuild(vectors, np.array([meta['vector_id'] for meta in self.metadata], dtype='int64'))
+                    migrated = True
+
                 # Rebuild ID mapping
                 for i, meta in enumerate(self.metadata):
                     if 'id' in meta:
                         self.id_to_metadata[meta['id']] = i
-                
+                    self._vector_positions[meta['vector_id']] = i
+                self._tombstones = set(self._index_ids().tolist()) - set(self._vector_positions)
+                # Only a successful load may rewrite the store on the next save
+                self._dirty = migrated
+
                 logger.info(f"Loaded {len(self.metadata)} metadata entries")
-                
+
             except Exception as e:
                 logger.error(f"Failed to load existing index: {e}")
-                self.index = faiss.IndexFlatIP(self.dimension)
+                self._dirty = False
+                self.index = self._new_index()
+                self._index_mmapped = False
                 self.metadata = []
                 self.id_to_metadata = {}
+                self._vector_positions = {}
+                self._tombstones = set()
+
+    def _read_index(self, index_file: Path, mmap: bool = False):
+        """
+        Read a saved index, memory-mapping its vectors read-only if asked
+
+        IO_FLAG_MMAP_IFC maps flat codes, which hold the vectors of flat and
+        HNSW indexes; IVF lists are still read into memory. FAISS builds
+        without the flag, or files it cannot map, are read normally.
+        """
+        if mmap:
+            try:
+                return faiss.read_index(str(index_file), faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+            except (AttributeError, RuntimeError) as e:
+                logger.warning(f"Cannot memory-map {index_file}, reading it into memory: {e}")
+        return faiss.read_index(str(index_file))
+
+    def _prepare_loaded(self, index):
+        """Ready a loaded ID-mapped index for reconstruct_batch and move it to the device"""
+        base = faiss.downcast_index(index.index)
+        if isinstance(base, faiss.IndexIVF):
+            base.make_direct_map()
+        return self._to_device(index)
+
+    def _materialize_index(self):
+        """
+        Replace a memory-mapped index with one read fully into memory
+
+        Mapped vectors are read-only (FAISS aborts on adding to them) and
+        keep the index file open, which blocks replacing it on Windows, so
+        this runs before the index is modified or saved.
+        """
+        if not self._index_mmapped:
+            return
+        self.index = self._prepare_loaded(self._read_index(self.index_path / "faiss_index.bin"))
+        self._index_mmapped = False
+        logger.info("Read memory-mapped FAISS index into memory")
+
+    def _read_store_info(self) -> Dict:
+        """Read the settings saved alongside the index"""
+        info_file = self.index_path / "store_info.json"
+        if not info_file.exists():
+            return {}
+        with open(info_file, 'rb') as f:
+            return _loads(f.read())
+
+    def _metadata_file(self) -> Optional[Path]:
+        """Return the saved metadata file, preferring Parquet over pickle over legacy JSON"""
+        for name in ("metadata.parquet", "metadata.pkl", "metadata.json"):
+            path = self.index_path / name
+            if path.exists():
+                return path
+        return None
+
+    def _read_metadata(self, path: Path) -> List[Dict]:
+        """Read metadata saved by _write_metadata or an older JSON store"""
+        if path.suffix == ".parquet":
+            records = pd.read_parquet(path).to_dict('records')
+            for record in records:
+                record['metadata'] = _loads(record['metadata'])
+            return records
+        if path.suffix == ".pkl":
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        with open(path, 'rb') as f:
+            return _loads(f.read())
+
+    def _write_metadata(self, metadata: List[Dict]):
+        """Write metadata as zstd Parquet, or pickle when no Parquet engine is installed"""
+        parquet_file = self.index_path / "metadata.parquet"
+        pickle_file = self.index_path / "metadata.pkl"
+        try:
+            frame = pd.DataFrame(metadata, columns=METADATA_COLUMNS)
+            # Per-document metadata has no fixed schema, so store it as JSON text
+            frame['metadata'] = [_dumps(meta).decode() for meta in frame['metadata']]
+            tmp_file = self.index_path / "metadata.tmp.parquet"
+            frame.to_parquet(tmp_file, compression="zstd", index=False)
+            written = parquet_file
+        except ImportError:
+            tmp_file = self.index_path / "metadata.tmp.pkl"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(metadata, f, protocol=5)
+            written = pickle_file
+        os.replace(tmp_file, written)
+
+        # Drop older formats so _metadata_file never picks a stale copy
+        for name in ("metadata.parquet", "metadata.pkl", "metadata.json"):
+            path = self.index_path / name
+            if path != written and path.exists():
+                path.unlink()
     
-    def _save_index(self):
-        """Save FAISS index and metadata"""
+    def _save_index(self, wait: bool = False) -> Future:
+        """
+        Save FAISS index and metadata on the background save thread
+
+        Calls made while a save is still queued share it, and saves are spaced
+        at least SAVE_INTERVAL_SECONDS apart, so bursts of changes cost one write.
+
+        Args:
+            wait: Block until the save has finished
+
+        Returns:
+            Future of the queued save
+        """
+        with self._lock:
+            # A queued save that has not taken its snapshot yet will include
+            # everything changed so far
+            if not self._snapshot_pending:
+                self._snapshot_pending = True
+                self._save_future = self._save_executor.submit(self._write_snapshot)
+            future = self._save_future
+        if wait:
+            future.result()
+        return future
+
+    def _write_snapshot(self):
+        """Snapshot the store under the lock, then write it out without holding it"""
+        delay = self._last_save + SAVE_INTERVAL_SECONDS - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
         try:
+            with self._lock:
+                self._snapshot_pending = False
+                self._flush_pending()
+                if self._tombstones:
+                    self._compact()
+                if not self._dirty:
+                    return
+                self._materialize_index()
+                index_bytes = faiss.serialize_index(self._cpu_index())
+                ntotal = self.index.ntotal
+                metadata = list(self.metadata)
+                hash_algo = self.hash_algo
+                self._dirty = False
+
             # Save FAISS index
             index_file = self.index_path / "faiss_index.bin"
-            faiss.write_index(self.index, str(index_file))
+            tmp_index_file = self.index_path / "faiss_index.tmp.bin"
+            with open(tmp_index_file, 'wb') as f:
+                index_bytes.tofile(f)
+            os.replace(tmp_index_file, index_file)
             
             # Save metadata
-            metadata_file = self.index_path / "metadata.json"
-            with open(metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            self._write_metadata(metadata)
+            with open(self.index_path / "store_info.json", 'wb') as f:
+                f.write(_dumps({'hash_algo': hash_algo}))
             
-            logger.info(f"Saved index with {self.index.ntotal} vectors")
+            # Embedding cache files written by older versions are redundant
+            # with the index, which holds every stored vector
+            for name in ("embedding_cache.npy", "embedding_cache_ids.json"):
+                path = self.index_path / name
+                if path.exists():
+                    path.unlink()
+
+            logger.info(f"Saved index with {ntotal} vectors")
             
         except Exception as e:
+            self._dirty = True
             logger.error(f"Failed to save index: {e}")
+        finally:
+            self._last_save = time.monotonic()
     
+    @staticmethod
+    def _vector_id(doc_id: str) -> int:
+        """Stable FAISS ID for a document: the leading 63 bits of its content hash"""
+        return int(doc_id[:16], 16) & 0x7FFFFFFFFFFFFFFF
+
     def _generate_id(self, content: str) -> str:
         """Generate unique ID for content"""
-        return hashlib.md5(content.encode()).hexdigest()
+        return HASHERS[self.hash_algo](content.encode())
     
     def add_document(self, 
                      content: str, 
@@ -124,55 +619,135 @@ class ARGOVectorStore:
         Returns:
             Document ID
         """
+        doc_ids = self.add_documents_batch([content], [metadata], doc_type)
+        if not doc_ids:
+            return None
+        logger.info(f"Added document {doc_ids[0]} to vector store")
+        return doc_ids[0]
+
+    @_synchronized
+    def add_documents_batch(self,
+                            contents: List[str],
+                            metadatas: List[Dict],
+                            doc_types: Union[str, List[str]] = "profile") -> List[str]:
+        """
+        Add several documents with one encoder call and one index add
+
+        Args:
+            contents: Text contents to embed
+            metadatas: Associated metadata, one per content
+            doc_types: Document type for all contents, or one per content
+
+        Returns:
+            List of document IDs, one per content
+        """
+        if isinstance(doc_types, str):
+            doc_types = [doc_types] * len(contents)
+
         try:
-            # Generate embedding
-            embedding = self.encoder.encode([content])[0]
-            
-            # Normalize for cosine similarity
-            embedding = embedding / np.linalg.norm(embedding)
-            
-            # Generate document ID
-            doc_id = self._generate_id(content)
-            
-            # Check if document already exists
-            if doc_id in self.id_to_metadata:
-                logger.info(f"Document {doc_id} already exists, updating...")
-                idx = self.id_to_metadata[doc_id]
-                self.metadata[idx] = {
-                    'id': doc_id,
-                    'content': content,
-                    'metadata': metadata,
-                    'doc_type': doc_type,
-                    'created_at': datetime.now().isoformat(),
-                    'updated_at': datetime.now().isoformat()
-                }
-                # Update vector
-                self.index.remove_ids(np.array([idx]))
-                self.index.add_with_ids(np.array([embedding]), np.array([idx]))
-            else:
-                # Add new document
+            now = datetime.now().isoformat()
+            doc_ids = []
+            new_docs = []
+            new_positions = {}
+            for content, metadata, doc_type in zip(contents, metadatas, doc_types):
+                doc_id = self._generate_id(content)
                 doc_meta = {
                     'id': doc_id,
                     'content': content,
                     'metadata': metadata,
                     'doc_type': doc_type,
-                    'created_at': datetime.now().isoformat(),
-                    'updated_at': datetime.now().isoformat()
+                    'created_at': now,
+                    'updated_at': now
                 }
-                
-                self.metadata.append(doc_meta)
-                self.id_to_metadata[doc_id] = len(self.metadata) - 1
-                
-                # Add to FAISS index
-                self.index.add(np.array([embedding]))
-            
-            logger.info(f"Added document {doc_id} to vector store")
-            return doc_id
-            
+                if doc_id in self.id_to_metadata:
+                    # The ID is a hash of the content, so the indexed vector is
+                    # already correct and only the metadata needs updating
+                    logger.debug(f"Document {doc_id} already exists, updating...")
+                    idx = self.id_to_metadata[doc_id]
+                    doc_meta['created_at'] = self.metadata[idx].get('created_at', now)
+                    doc_meta['vector_id'] = self.metadata[idx]['vector_id']
+                    self.metadata[idx] = doc_meta
+                    self._selector_cache.clear()
+                    self._dirty = True
+                elif doc_id in new_positions:
+                    new_docs[new_positions[doc_id]] = doc_meta
+                else:
+                    new_positions[doc_id] = len(new_docs)
+                    new_docs.append(doc_meta)
+                doc_ids.append(doc_id)
+
+            if new_docs:
+                for doc in new_docs:
+                    doc['vector_id'] = self._vector_id(doc['id'])
+                # A document deleted earlier may still sit in the index under
+                # its stable vector ID; revive it instead of adding it twice
+                queued = [doc for doc in new_docs if doc['vector_id'] not in self._tombstones]
+
+                # Generate and normalize embeddings in one pass; stored
+                # contents were skipped above by their content-hash IDs
+                if queued:
+                    encoded = self._encode([doc['content'] for doc in queued],
+                                           batch_size=ENCODE_BATCH_SIZE)
+
+                start = len(self.metadata)
+                self.metadata.extend(new_docs)
+                for offset, doc in enumerate(new_docs):
+                    self.id_to_metadata[doc['id']] = start + offset
+                    self._vector_positions[doc['vector_id']] = start + offset
+                    self._tombstones.discard(doc['vector_id'])
+                self._selector_cache.clear()
+                self._dirty = True
+
+                if queued:
+                    # Queue for the FAISS index; single-document adds are
+                    # coalesced into one add_with_ids per ADD_FLUSH_SIZE vectors
+                    self._pending_vectors.append(encoded)
+                    self._pending_ids.append(np.array([doc['vector_id'] for doc in queued], dtype='int64'))
+                    self._pending_count += len(queued)
+                    if self._pending_count >= ADD_FLUSH_SIZE:
+                        self._flush_pending()
+
+            return doc_ids
+
         except Exception as e:
-            logger.error(f"Failed to add document: {e}")
-            return None
+            logger.error(f"Failed to add documents: {e}")
+            return []
     
+    @staticmethod
+    def _profile_contents(df: pd.DataFrame) -> pd.Series:
+        """
+        Build the embedding text for every profile row with column operations
+
+        Each fragment is a Series that is empty where its value is missing and
+        otherwise starts with the separator, so concatenating them and
+        dropping the leading separator joins only the present fragments.
+        """
+        sep = " | "
+        empty = pd.Series("", index=df.index, dtype=object)
+        if df.empty:
+            return empty
+        content = empty
+        # Basic location info
+        if 'latitude' in df and 'longitude' in df:
+            content = (content + sep + "Location: " + _format_2f(df['latitude'])
+                       + "°N, " + _format_2f(df['longitude']) + "°E")
+        # Date and platform info
+        for col, label in (('date', 'Date'), ('platform_number', 'Platform')):
+            if col in df:
+                content = content + (sep + label + ": " + df[col].map(str)).where(df[col].notna(), "")
+        # Oceanographic data
+        for var in OCEAN_VARS:
+            if var in df:
+                fragment = sep + var.title() + ": " + _format_2f(df[var])
+                content = content + fragment.where(df[var].notna(), "")
+        # Quality info
+        qc_info = empty
+        for qc_var in (col for col in df.columns if str(col).endswith('_qc')):
+            fragment = ", " + qc_var + ": " + df[qc_var].map(str)
+            qc_info = qc_info + fragment.where(df[qc_var].notna(), "")
+        content = content + (sep + "Quality: " + qc_info.str[2:]).where(qc_info != "", "")
+        return content.str[len(sep):]
+
     def add_profile_data(self, df: pd.DataFrame) -> List[str]:
         """
         Add ARGO profile data to vector store
@@ -183,52 +758,33 @@ class ARGOVectorStore:
         Returns:
             List of document IDs
         """
-        doc_ids = []       
-        for idx, row in df.iterrows():
-            # Create content for embedding
-            content_parts = []
-                       # Basic location info
-            if 'latitude' in row and 'longitude' in row:
-                content_parts.append(f"Location: {row['latitude']:.2f}°N, {row['longitude']:.2f}°E")            
-            # Date info
-            if 'date' in row and pd.notna(row['date']):
-                content_parts.append(f"Date: {row['date']}")           
-            # Platform info
-            if 'platform_number' in row and pd.notna(row['platform_number']):
-                content_parts.append(f"Platform: {row['platform_number']}")           
-            # Oceanographic data
-            ocean_vars = ['temperature', 'salinity', 'pressure']
-            for var in ocean_vars:
-                if var in row and pd.notna(row[var]):
-                    content_parts.append(f"{var.title()}: {row[var]:.2f}")           
-            # Quality info
-            qc_vars = [col for col in row.index if col.endswith('_qc')]
-            qc_info = []
-            for qc_var in qc_vars:
-                if pd.notna(row[qc_var]):
-                    qc_info.append(f"{qc_var}: {row[qc_var]}")            
-            if qc_info:
-                content_parts.append(f"Quality: {', '.join(qc_info)}")           
-            content = " | ".join(content_parts)            
-            # Create metadata
-            metadata = {
-                'profile_index': idx,
-                'latitude': float(row.get('latitude', 0)) if pd.notna(row.get('latitude')) else None,
-                'longitude': float(row.get('longitude', 0)) if pd.notna(row.get('longitude')) else None,
-                'date': str(row.get('date', '')) if pd.notna(row.get('date')) else None,
-                'platform_number': str(row.get('platform_number', '')) if pd.notna(row.get('platform_number')) else None,
-                'cycle_number': int(row.get('cycle_number', 0)) if pd.notna(row.get('cycle_number')) else None
-            }
-            
-            # Add oceanographic measurements
-            for var in ocean_vars:
-                if var in row and pd.notna(row[var]):
-                    metadata[var] = float(row[var])
-            
-            doc_id = self.add_document(content, metadata, "profile")
-            if doc_id:
-                doc_ids.append(doc_id)
-        
+        contents = self._profile_contents(df).tolist()
+
+        # Convert each metadata column once, then zip the columns into rows
+        def column(name, convert):
+            if name not in df:
+                return [None] * len(df)
+            return [convert(value) if present else None
+                    for value, present in zip(df[name].tolist(), df[name].notna().tolist())]
+
+        base_columns = {
+            'profile_index': df.index.tolist(),
+            'latitude': column('latitude', float),
+            'longitude': column('longitude', float),
+            'date': column('date', str),
+            'platform_number': column('platform_number', str),
+            'cycle_number': column('cycle_number', int)
+        }
+        metadatas = [dict(zip(base_columns, values)) for values in zip(*base_columns.values())]
+
+        # Add oceanographic measurements where present
+        for var in OCEAN_VARS:
+            if var in df:
+                for metadata, value in zip(metadatas, column(var, float)):
+                    if value is not None:
+                        metadata[var] = value
+
+        doc_ids = self.add_documents_batch(contents, metadatas, "profile")
         logger.info(f"Added {len(doc_ids)} profiles to vector store")
         return doc_ids
     
@@ -277,24 +833,79 @@ class ARGOVectorStore:
             List of search results with metadata
         """
         try:
+            self._flush_pending()
+
             # Generate query embedding
-            query_embedding = self.encoder.encode([query])[0]
-            query_embedding = query_embedding / np.linalg.norm(query_embedding)          
-            # Search FAISS index
-            scores, indices = self.index.search(np.array([query_embedding]), k)           
-            results = []
-            for score, idx in zip(scores[0], indices[0]):
-                if idx < len(self.metadata):
+            query_embedding = self._encode(query)[np.newaxis, :]
+            # The background save may compact (swap) the index, so the index,
+            # selectors and ID map are read together under the lock
+            with self._lock:
+                if doc_types:
+                    # Restrict the search to the requested types inside FAISS, so
+                    # k hits come back even when the types are rare
+                    selector = self._doc_type_selector(doc_types)
+                    if selector is None:
+                        return []
+                    params = self._search_params(selector)
+                else:
+                    params = None
+                # Search FAISS index, over-fetching to make up for tombstoned hits
+                # (selectors only cover live documents)
+                fetch_k = min(k if params is not None else k + len(self._tombstones), self.index.ntotal)
+                if fetch_k <= 0:
+                    return []
+                scores, indices = self.index.search(query_embedding, fetch_k, params=params)
+                if self.index.metric_type == faiss.METRIC_L2:
+                    scores = 1 - scores / 2
+                results = []
+                live_hits = 0
+                for score, vector_id in zip(scores[0], indices[0]):
+                    idx = self._vector_positions.get(int(vector_id))
+                    if idx is None:
+                        # Unfilled slot (-1) or tombstoned vector
+                        continue
+                    live_hits += 1
+                    if live_hits > k:
+                        break
                     doc = self.metadata[idx].copy()
-                    doc['similarity_score'] = float(score)                   
+                    doc['similarity_score'] = float(score)
                     # Apply filters
                     if self._matches_filters(doc, doc_types, filters):
-                        results.append(doc)           
+                        results.append(doc)
             logger.info(f"Found {len(results)} results for query: {query[:50]}...")
             return results           
         except Exception as e:
             logger.error(f"Search failed: {e}")
             return []    
+    def _doc_type_selector(self, doc_types: List[str]) -> Optional[faiss.IDSelector]:
+        """Return a cached selector over the FAISS IDs of live documents of the given types"""
+        key = tuple(sorted(set(doc_types)))
+        if key not in self._selector_cache:
+            wanted = set(key)
+            ids = np.array([doc['vector_id'] for doc in self.metadata if doc.get('doc_type') in wanted],
+                           dtype='int64')
+            self._selector_cache[key] = faiss.IDSelectorBatch(ids) if len(ids) else None
+        return self._selector_cache[key]
+
+    def _search_params(self, selector: faiss.IDSelector) -> Optional[faiss.SearchParameters]:
+        """
+        Build search parameters carrying the selector for the current index
+
+        IndexIDMap2 maps the selector to internal IDs and hands the same
+        parameters to the wrapped index, so their type has to match it; the
+        index's own efSearch / nprobe are carried over as the parameters
+        replace them. GPU indexes take no selector and return None, leaving
+        the doc_types filtering to _matches_filters.
+        """
+        base = faiss.downcast_index(self._shards()[0].index)
+        if type(base).__name__.startswith("Gpu"):
+            return None
+        if isinstance(base, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=base.hnsw.efSearch)
+        if isinstance(base, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=base.nprobe)
+        return faiss.SearchParameters(sel=selector)
+
     def _matches_filters(self, doc: Dict, doc_types: List[str], filters: Dict) -> bool:
         """Check if document matches the given filters"""
         # Check document type filter
@@ -320,27 +931,43 @@ class ARGOVectorStore:
             return self.metadata[idx]
         return None
     
+    @_synchronized
     def delete_document(self, doc_id: str) -> bool:
         """Delete a document by ID"""
         if doc_id not in self.id_to_metadata:
             return False
-        
+
         try:
-            idx = self.id_to_metadata[doc_id]           
-            # Remove from FAISS index
-            self.index.remove_ids(np.array([idx]))            
-            # Remove from metadata
-            del self.metadata[idx]
-            del self.id_to_metadata[doc_id]            
-            # Rebuild ID mapping
-            self.id_to_metadata = {doc['id']: i for i, doc in enumerate(self.metadata)}            
+            self._flush_pending()
+            idx = self.id_to_metadata.pop(doc_id)
+            vector_id = self.metadata[idx]['vector_id']
+            # Move the last document into the freed slot instead of shifting the list
+            last = self.metadata.pop()
+            if idx < len(self.metadata):
+                self.metadata[idx] = last
+                self.id_to_metadata[last['id']] = idx
+                self._vector_positions[last['vector_id']] = idx
+            del self._vector_positions[vector_id]
+            self._selector_cache.clear()
+            self._dirty = True
+
+            self._materialize_index()
+            try:
+                self.index.remove_ids(np.array([vector_id], dtype='int64'))
+            except RuntimeError:
+                # HNSW cannot remove vectors, so tombstone the ID and compact
+                # once enough of the graph is dead
+                self._tombstones.add(vector_id)
+                if len(self._tombstones) > TOMBSTONE_REBUILD_RATIO * self.index.ntotal:
+                    self._compact()
             logger.info(f"Deleted document {doc_id}")
-            return True           
+            return True
         except Exception as e:
             logger.error(f"Failed to delete document {doc_id}: {e}")
-            return False   
+            return False
     def get_stats(self) -> Dict:
         """Get vector store statistics"""
+        self._flush_pending()
         return {
             'total_documents': len(self.metadata),
             'index_size': self.index.ntotal,
@@ -349,19 +976,28 @@ class ARGOVectorStore:
             'doc_types': list(set(doc.get('doc_type', 'unknown') for doc in self.metadata)),
             'last_updated': datetime.now().isoformat()
         }   
+    @_synchronized
     def clear(self):
         """Clear all data from the vector store"""
-        self.index = faiss.IndexFlatIP(self.dimension)
+        self.index = self._new_index()
+        self._index_mmapped = False
         self.metadata = []
         self.id_to_metadata = {}
+        self._vector_positions = {}
+        self._tombstones = set()
+        self._selector_cache = {}
+        self._pending_vectors = []
+        self._pending_ids = []
+        self._pending_count = 0
+        self._dirty = True
         logger.info("Cleared vector store")   
     def export_metadata(self, output_file: str = None) -> str:
         """Export metadata to JSON file"""
         if output_file is None:
             output_file = self.index_path / f"metadata_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"       
         try:
-            with open(output_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            with open(output_file, 'wb') as f:
+                f.write(_dumps(self.metadata, indent=True))
             
             logger.info(f"Exported metadata to {output_file}")
             return str(output_file)          
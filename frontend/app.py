@@ -20,6 +20,15 @@ from pathlib import Path
 import hashlib
 import sqlite3
 import bcrypt
+from contextlib import contextmanager
+from queue import Queue
+from types import MappingProxyType
+
+try:
+    from plotly_resampler import FigureResampler
+    from plotly_resampler.aggregation import LTTB
+except ImportError:
+    FigureResampler = None
 
 # Add backend to path
 sys.path.append('../backend')
@@ -50,12 +59,13 @@ st.set_page_config(
     }
 )
 
-# Custom CSS for modern styling
-def load_css():
-    st.markdown("""
+# Custom CSS for modern styling. The font stylesheet is linked rather than
+# @import-ed so the browser fetches it alongside the page instead of after
+# parsing the style block.
+APP_CSS = """
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap">
     <style>
-    /* Import Google Fonts */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
     
     /* Global Styles */
     .main {
@@ -121,6 +131,16 @@ def load_css():
         margin-bottom: 1rem;
     }
     
+    .feature-cards {
+        display: flex;
+        flex-wrap: wrap;
+        gap: 1rem;
+    }
+    
+    .feature-cards .feature-card {
+        flex: 1 1 220px;
+    }
+    
     .feature-card:hover {
         transform: translateY(-5px);
     }
@@ -230,7 +250,10 @@ def load_css():
         background: #2980b9;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+def load_css():
+    st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # Initialize session state
 def init_session_state():
@@ -240,6 +263,8 @@ def init_session_state():
         st.session_state.user_id = None
     if 'username' not in st.session_state:
         st.session_state.username = None
+    if 'api_key' not in st.session_state:
+        st.session_state.api_key = None
     if 'current_page' not in st.session_state:
         st.session_state.current_page = 'Home'
     if 'dark_mode' not in st.session_state:
@@ -250,28 +275,73 @@ def init_session_state():
         st.session_state.uploaded_files = []
 
 # Database functions
+# Kept as one constant so each pooled connection's statement cache reuses the
+# prepared lookup; the UNIQUE constraint's index already serves it
+LOGIN_SQL = 'SELECT id, username, password_hash FROM users WHERE username = ?'
+
+# bcrypt cost for new password hashes; each step doubles hashing time, so dev
+# deployments can drop to 10. Existing hashes keep the cost they were made with.
+BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+
+class ConnectionPool:
+    """Fixed set of SQLite connections shared by all sessions, so concurrent logins don't queue on one"""
+    
+    def __init__(self, db_path, size=5):
+        self.db_path = db_path
+        self._connections = Queue(maxsize=size)
+        for _ in range(size):
+            self._connections.put(self._create_connection())
+    
+    def _create_connection(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA cache_size=-20000')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+    
+    @contextmanager
+    def borrow(self, timeout=10):
+        """Check out a connection for the duration of the block"""
+        conn = self._connections.get(timeout=timeout)
+        try:
+            yield conn
+        except sqlite3.ProgrammingError:
+            # The connection is unusable (e.g. closed); replace it with a fresh one
+            conn.close()
+            conn = self._create_connection()
+            raise
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._connections.put(conn)
+
+@st.cache_resource
+def get_pool():
+    """Create the user database pool once per server process"""
+    return ConnectionPool('neptuneai_users.db')
+
 def init_database():
     """Initialize SQLite database for user management"""
-    conn = sqlite3.connect('neptuneai_users.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            api_key TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    with get_pool().borrow() as conn, conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                api_key TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
 
 def hash_password(password):
     """Hash password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+def derive_api_key(username, user_id):
+    """Derive the API key shown on the profile page"""
+    return "neptuneai_" + hashlib.sha256(f"{username}{user_id}".encode()).hexdigest()[:16]
 
 def verify_password(password, hashed):
     """Verify password against hash"""
@@ -279,35 +349,27 @@ def verify_password(password, hashed):
 
 def register_user(username, email, password):
     """Register a new user"""
-    conn = sqlite3.connect('neptuneai_users.db')
-    cursor = conn.cursor()
-    
     try:
         password_hash = hash_password(password)
         api_key = hashlib.sha256(f"{username}{email}{datetime.now()}".encode()).hexdigest()[:32]
         
-        cursor.execute('''
-            INSERT INTO users (username, email, password_hash, api_key)
-            VALUES (?, ?, ?, ?)
-        ''', (username, email, password_hash, api_key))
+        with get_pool().borrow() as conn, conn:
+            conn.execute('''
+                INSERT INTO users (username, email, password_hash, api_key)
+                VALUES (?, ?, ?, ?)
+            ''', (username, email, password_hash, api_key))
         
-        conn.commit()
         return True, "User registered successfully!"
     except sqlite3.IntegrityError:
         return False, "Username or email already exists!"
     except Exception as e:
         return False, f"Registration failed: {str(e)}"
-    finally:
-        conn.close()
 
 def login_user(username, password):
     """Login user"""
-    conn = sqlite3.connect('neptuneai_users.db')
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute('SELECT id, username, password_hash FROM users WHERE username = ?', (username,))
-        user = cursor.fetchone()
+        with get_pool().borrow() as conn:
+            user = conn.execute(LOGIN_SQL, (username,)).fetchone()
         
         if user and verify_password(password, user[2]):
             return True, user[0], user[1]
@@ -315,12 +377,50 @@ def login_user(username, password):
             return False, None, None
     except Exception as e:
         return False, None, None
-    finally:
-        conn.close()
+
+# Sample ARGO datasets
+@st.cache_resource
+def get_argo_dataset_details():
+    """Detail markdown per sample ARGO dataset; static, so built once per server process and shared read-only"""
+    datasets = {
+        "Indian Ocean ARGO 2023": {
+            "description": "Comprehensive ARGO float data from Indian Ocean for 2023",
+            "records": "15,432",
+            "variables": "Temperature, Salinity, Pressure, Oxygen",
+            "coverage": "10°S to 30°N, 40°E to 120°E",
+            "format": "NetCDF, CSV"
+        },
+        "Global ARGO Real-time": {
+            "description": "Real-time global ARGO float data updated daily",
+            "records": "2,847,291",
+            "variables": "Temperature, Salinity, Pressure, Chlorophyll",
+            "coverage": "Global",
+            "format": "NetCDF"
+        },
+        "Deep Ocean Profiles": {
+            "description": "Deep ocean profiling data from ARGO floats",
+            "records": "8,923",
+            "variables": "Temperature, Salinity, Pressure, Nutrients",
+            "coverage": "Global",
+            "format": "NetCDF, Parquet"
+        }
+    }
+    return MappingProxyType({
+        name: (f"**Description:** {info['description']}\n\n"
+               f"**Records:** {info['records']}\n\n"
+               f"**Variables:** {info['variables']}\n\n"
+               f"**Coverage:** {info['coverage']}\n\n"
+               f"**Format:** {info['format']}")
+        for name, info in datasets.items()
+    })
+
+# Maps with more points than this bin them into hexagons instead of drawing each one
+MAP_AGGREGATE_THRESHOLD = 5000
 
 # Sample data generation
+@st.cache_data(show_spinner=False)
 def generate_sample_data():
-    """Generate sample ARGO data for demonstration"""
+    """Generate sample ARGO data for demonstration (seeded, so built once and cached)"""
     np.random.seed(42)
     
     # Generate sample ARGO float data
@@ -340,6 +440,23 @@ def generate_sample_data():
     return pd.DataFrame(data)
 
 # Page functions
+FEATURE_CARDS_HTML = """
+<div class="feature-cards">
+    <div class="feature-card">
+        <h3>🔍 Smart Search</h3>
+        <p>Find relevant ocean data using natural language queries powered by advanced AI algorithms.</p>
+    </div>
+    <div class="feature-card">
+        <h3>📊 Real-time Analytics</h3>
+        <p>Interactive dashboards and visualizations that update in real-time as you explore your data.</p>
+    </div>
+    <div class="feature-card">
+        <h3>🤖 AI-Powered Insights</h3>
+        <p>Get automated insights, pattern recognition, and predictive analytics for your ocean data.</p>
+    </div>
+</div>
+"""
+
 def render_header():
     """Render the main header"""
     st.markdown("""
@@ -386,6 +503,8 @@ def render_sidebar():
                         st.session_state.authenticated = True
                         st.session_state.user_id = user_id
                         st.session_state.username = username
+                        # Derived once per login rather than on every profile rerun
+                        st.session_state.api_key = derive_api_key(username, user_id)
                         st.success("Login successful!")
                         st.rerun()
                     else:
@@ -413,6 +532,7 @@ def render_sidebar():
             st.session_state.authenticated = False
             st.session_state.user_id = None
             st.session_state.username = None
+            st.session_state.api_key = None
             st.rerun()
     
     # Dark mode toggle
@@ -472,34 +592,9 @@ def render_home_page():
         </div>
         """, unsafe_allow_html=True)
     
-    # Feature cards
+    # Feature cards, laid out by the .feature-cards flex row in one element
     st.markdown("## ✨ Platform Features")
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown("""
-        <div class="feature-card">
-            <h3>🔍 Smart Search</h3>
-            <p>Find relevant ocean data using natural language queries powered by advanced AI algorithms.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="feature-card">
-            <h3>📊 Real-time Analytics</h3>
-            <p>Interactive dashboards and visualizations that update in real-time as you explore your data.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div class="feature-card">
-            <h3>🤖 AI-Powered Insights</h3>
-            <p>Get automated insights, pattern recognition, and predictive analytics for your ocean data.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(FEATURE_CARDS_HTML, unsafe_allow_html=True)
     
     # Latest updates
     st.markdown("## 📰 Latest Updates")
@@ -537,17 +632,21 @@ def render_analytics_page():
                                float(df['temperature'].max()),
                                (float(df['temperature'].min()), float(df['temperature'].max())))
     
-    # Apply filters
-    filtered_df = df.copy()
+    # Apply filters as one combined mask, indexing the frame once
+    mask = np.ones(len(df), dtype=bool)
     if ocean_filter != "All":
-        filtered_df = filtered_df[filtered_df['ocean'] == ocean_filter]
+        mask &= df['ocean'].to_numpy() == ocean_filter
     if institution_filter != "All":
-        filtered_df = filtered_df[filtered_df['institution'] == institution_filter]
+        mask &= df['institution'].to_numpy() == institution_filter
     if len(date_range) == 2:
-        filtered_df = filtered_df[(filtered_df['date'].dt.date >= date_range[0]) & 
-                                  (filtered_df['date'].dt.date <= date_range[1])]
-    filtered_df = filtered_df[(filtered_df['temperature'] >= temp_range[0]) & 
-                              (filtered_df['temperature'] <= temp_range[1])]
+        # Compare datetime64 values directly; the end date includes its whole day
+        dates = df['date'].to_numpy()
+        start = pd.Timestamp(date_range[0]).to_datetime64()
+        end = (pd.Timestamp(date_range[1]) + pd.Timedelta(days=1)).to_datetime64()
+        mask &= (dates >= start) & (dates < end)
+    temperatures = df['temperature'].to_numpy()
+    mask &= (temperatures >= temp_range[0]) & (temperatures <= temp_range[1])
+    filtered_df = df[mask]
     
     # Metrics
     st.markdown("### 📈 Key Metrics")
@@ -571,25 +670,40 @@ def render_analytics_page():
                       color='ocean', size='pressure',
                       hover_data=['platform_number', 'date', 'institution'],
                       title="Temperature vs Salinity by Ocean",
-                      color_discrete_sequence=px.colors.qualitative.Set3)
+                      color_discrete_sequence=px.colors.qualitative.Set3,
+                      render_mode='webgl')
     fig1.update_layout(height=500)
-    st.plotly_chart(fig1, use_container_width=True)
+    st.plotly_chart(fig1, use_container_width=True, key='ts_scatter')
     
     # Geographic distribution
     st.markdown("#### 🌍 Geographic Distribution")
     
-    # Create map
-    map_data = filtered_df[['latitude', 'longitude', 'temperature', 'ocean']].copy()
+    # Create map, sending only the columns the layers read; pydeck writes every
+    # row out as JSON, so round to what the map can show (~10 m, 0.01 °C)
+    map_data = filtered_df[['latitude', 'longitude', 'temperature']].round(
+        {'latitude': 4, 'longitude': 4, 'temperature': 2})
     
     # PyDeck map
-    layer = pdk.Layer(
-        'ScatterplotLayer',
-        data=map_data,
-        get_position='[longitude, latitude]',
-        get_color='[200, 30, 0, 160]',
-        get_radius=1000,
-        pickable=True
-    )
+    if len(map_data) > MAP_AGGREGATE_THRESHOLD:
+        # Aggregate large point clouds into hexagon bins on the GPU
+        layer = pdk.Layer(
+            'HexagonLayer',
+            data=map_data,
+            get_position='[longitude, latitude]',
+            radius=50000,
+            elevation_scale=50,
+            pickable=True,
+            extruded=True
+        )
+    else:
+        layer = pdk.Layer(
+            'ScatterplotLayer',
+            data=map_data,
+            get_position='[longitude, latitude]',
+            get_color='[200, 30, 0, 160]',
+            get_radius=1000,
+            pickable=True
+        )
     
     view_state = pdk.ViewState(
         latitude=map_data['latitude'].mean(),
@@ -603,13 +717,14 @@ def render_analytics_page():
         map_style='mapbox://styles/mapbox/light-v9'
     )
     
-    st.pydeck_chart(r)
+    st.pydeck_chart(r, key='argo_map')
     
     # Time series analysis
     st.markdown("#### 📈 Time Series Analysis")
     
     # Group by date and calculate averages
-    daily_avg = filtered_df.groupby(filtered_df['date'].dt.date).agg({
+    # Flooring keeps datetime64 keys, which group far faster than date objects
+    daily_avg = filtered_df.groupby(filtered_df['date'].dt.floor('D')).agg({
         'temperature': 'mean',
         'salinity': 'mean',
         'pressure': 'mean'
@@ -618,16 +733,25 @@ def render_analytics_page():
     fig2 = make_subplots(rows=3, cols=1, 
                          subplot_titles=('Temperature Over Time', 'Salinity Over Time', 'Pressure Over Time'),
                          vertical_spacing=0.1)
-    
-    fig2.add_trace(go.Scatter(x=daily_avg['date'], y=daily_avg['temperature'], 
-                              name='Temperature', line=dict(color='#3498db')), row=1, col=1)
-    fig2.add_trace(go.Scatter(x=daily_avg['date'], y=daily_avg['salinity'], 
-                              name='Salinity', line=dict(color='#e74c3c')), row=2, col=1)
-    fig2.add_trace(go.Scatter(x=daily_avg['date'], y=daily_avg['pressure'], 
-                              name='Pressure', line=dict(color='#2ecc71')), row=3, col=1)
+    if FigureResampler is not None:
+        # Downsample long series server-side with Largest-Triangle-Three-Buckets,
+        # which keeps the peaks and troughs a plot of this width can show
+        fig2 = FigureResampler(fig2, default_n_shown_samples=800, default_downsampler=LTTB())
+    
+    dates = daily_avg['date'].to_numpy()
+    series = [('temperature', 'Temperature', '#3498db'),
+              ('salinity', 'Salinity', '#e74c3c'),
+              ('pressure', 'Pressure', '#2ecc71')]
+    for row, (column, name, color) in enumerate(series, start=1):
+        trace = go.Scattergl(name=name, line=dict(color=color))
+        if FigureResampler is not None:
+            fig2.add_trace(trace, hf_x=dates, hf_y=daily_avg[column].to_numpy(), row=row, col=1)
+        else:
+            trace.update(x=dates, y=daily_avg[column])
+            fig2.add_trace(trace, row=row, col=1)
     
     fig2.update_layout(height=800, showlegend=False)
-    st.plotly_chart(fig2, use_container_width=True)
+    st.plotly_chart(fig2, use_container_width=True, key='timeseries')
     
     # Data table
     st.markdown("#### 📋 Data Table")
@@ -643,40 +767,11 @@ def render_datasets_page():
     with tab1:
         st.markdown("### ARGO Float Datasets")
         
-        # Sample ARGO datasets
-        argo_datasets = {
-            "Indian Ocean ARGO 2023": {
-                "description": "Comprehensive ARGO float data from Indian Ocean for 2023",
-                "records": "15,432",
-                "variables": "Temperature, Salinity, Pressure, Oxygen",
-                "coverage": "10°S to 30°N, 40°E to 120°E",
-                "format": "NetCDF, CSV"
-            },
-            "Global ARGO Real-time": {
-                "description": "Real-time global ARGO float data updated daily",
-                "records": "2,847,291",
-                "variables": "Temperature, Salinity, Pressure, Chlorophyll",
-                "coverage": "Global",
-                "format": "NetCDF"
-            },
-            "Deep Ocean Profiles": {
-                "description": "Deep ocean profiling data from ARGO floats",
-                "records": "8,923",
-                "variables": "Temperature, Salinity, Pressure, Nutrients",
-                "coverage": "Global",
-                "format": "NetCDF, Parquet"
-            }
-        }
-        
-        for name, info in argo_datasets.items():
+        for name, details in get_argo_dataset_details().items():
             with st.expander(f"📁 {name}", expanded=False):
                 col1, col2 = st.columns([2, 1])
                 with col1:
-                    st.write(f"**Description:** {info['description']}")
-                    st.write(f"**Records:** {info['records']}")
-                    st.write(f"**Variables:** {info['variables']}")
-                    st.write(f"**Coverage:** {info['coverage']}")
-                    st.write(f"**Format:** {info['format']}")
+                    st.markdown(details)
                 with col2:
                     if st.button(f"Download {name}", key=f"download_{name}"):
                         st.success("Download started!")
@@ -885,8 +980,7 @@ def render_profile_page():
         
         # API Key section
         st.markdown("### 🔑 API Key")
-        api_key = "neptuneai_" + hashlib.sha256(f"{st.session_state.username}{st.session_state.user_id}".encode()).hexdigest()[:16]
-        st.code(api_key)
+        st.code(st.session_state.api_key)
         
         if st.button("🔄 Generate New API Key"):
             st.success("New API key generated!")